@@ -2,11 +2,27 @@
 Meal Generator Package
 """
 
-from .generator import MealGenerator, MealGenerationError
+from .generator import MealGenerator, MealGenerationError, CircuitOpenError
 from .meal import Meal, ComponentDoesNotExist, DuplicateComponentIDError
 from .meal_component import MealComponent
 from .nutrient_profile import NutrientProfile
 from .models import MealType, ComponentType
+from .retriever import Retriever
+from .local_index import LocalRetriever, build_local_index
+from .llm_cache import LLMResponseCache
+from .batch import BatchResult
+from .context_encoding import ContextEncoder
+from .resilience import CircuitBreaker, RetryPolicy
+from .client_pool import ClientPool
+from .background_loop import BackgroundLoop, run_sync
+from .transport import (
+    Cassette,
+    CassetteMissError,
+    RecordingGenaiClient,
+    RecordingTransport,
+    ReplayGenaiClient,
+    ReplayTransport,
+)
 
 __all__ = [
     "MealGenerator",
@@ -15,7 +31,25 @@ __all__ = [
     "NutrientProfile",
     "MealType",
     "ComponentType",
+    "Retriever",
+    "LocalRetriever",
+    "build_local_index",
+    "LLMResponseCache",
+    "BatchResult",
+    "ContextEncoder",
+    "CircuitBreaker",
+    "RetryPolicy",
+    "ClientPool",
+    "BackgroundLoop",
+    "run_sync",
+    "Cassette",
+    "RecordingTransport",
+    "ReplayTransport",
+    "RecordingGenaiClient",
+    "ReplayGenaiClient",
     "MealGenerationError",
+    "CircuitOpenError",
+    "CassetteMissError",
     "DuplicateComponentIDError",
     "ComponentDoesNotExist",
 ]
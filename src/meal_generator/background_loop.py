@@ -0,0 +1,135 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Coroutine, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """
+    An event loop running forever on a daemon thread.
+
+    Synchronous callers submit coroutines with ``run``; because the loop
+    outlives each call, pooled HTTP sessions and client state are reused
+    across calls instead of being rebuilt by ``asyncio.run`` every time. It
+    is safe to call ``run`` from any thread, including one that is itself
+    running an event loop, but not from a coroutine on the background loop.
+    """
+
+    def __init__(self, name: str = "meal-generator-loop"):
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The background loop, started on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name=self._name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        logger.debug(f"Started background event loop thread '{self._name}'.")
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Runs ``coro`` on the background loop and blocks for its result."""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(
+                "BackgroundLoop.run() cannot be called from the background loop "
+                "itself; await the coroutine instead."
+            )
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timeouts and KeyboardInterrupt must not leave the work running.
+            future.cancel()
+            raise
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedules ``coro`` on the background loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """Drives an async iterator on the background loop, one item at a time."""
+        try:
+            while True:
+                try:
+                    yield self.run(_await(iterator.__anext__()))
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                self.run(_await(aclose()))
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stops the loop and joins its thread; the next call starts a new one."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+
+        async def _shutdown() -> None:
+            tasks = [
+                task
+                for task in asyncio.all_tasks()
+                if task is not asyncio.current_task()
+            ]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    # run_coroutine_threadsafe only accepts coroutines, not e.g. the
+    # awaitables returned by an async generator's __anext__ and aclose.
+    return await awaitable
+
+
+_default_loop: Optional[BackgroundLoop] = None
+_default_loop_lock = threading.Lock()
+
+
+def get_default_background_loop() -> BackgroundLoop:
+    """Returns the process-wide loop that backs the synchronous API."""
+    global _default_loop
+    with _default_loop_lock:
+        if _default_loop is None:
+            _default_loop = BackgroundLoop()
+        return _default_loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Runs ``coro`` on the process-wide background loop."""
+    return get_default_background_loop().run(coro, timeout)
@@ -0,0 +1,152 @@
+import asyncio
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+R = TypeVar("R")
+
+
+@dataclass
+class BatchResult(Generic[R]):
+    """The outcome of one item in a batch: either a result or the error raised."""
+
+    index: int
+    description: str
+    result: Optional[R] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_bounded(
+    descriptions: Iterable[str],
+    worker: Callable[[str], Awaitable[R]],
+    concurrency: int,
+) -> AsyncIterator[BatchResult[R]]:
+    """
+    Runs ``worker`` over ``descriptions`` with at most ``concurrency`` calls in
+    flight, yielding results in completion order. The input is consumed lazily,
+    so arbitrarily long iterables run in bounded memory. Exceptions raised by
+    a worker are captured on its result instead of aborting the batch.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+
+    async def _run(index: int, description: str) -> BatchResult[R]:
+        try:
+            return BatchResult(index, description, result=await worker(description))
+        except Exception as e:
+            return BatchResult(index, description, error=e)
+
+    items = iter(enumerate(descriptions))
+    pending: Set["asyncio.Task[BatchResult[R]]"] = set()
+
+    def _fill() -> None:
+        while len(pending) < concurrency:
+            item: Optional[Tuple[int, str]] = next(items, None)
+            if item is None:
+                return
+            pending.add(asyncio.ensure_future(_run(*item)))
+
+    try:
+        _fill()
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            _fill()
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class IdentificationBatcher:
+    """
+    Packs identification requests that arrive close together into one call.
+
+    Each ``identify`` call waits up to ``window`` seconds for other requests to
+    join its batch. A batch is sent early once it holds ``max_batch_size``
+    descriptions or ``max_batch_chars`` characters of input, which keeps each
+    packed prompt within a predictable size. ``identify_many`` receives the
+    descriptions and must return one result (or exception) per description,
+    in order.
+    """
+
+    def __init__(
+        self,
+        identify_many: Callable[[List[str]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_batch_chars: int = 8000,
+        window: float = 0.02,
+    ):
+        if max_batch_size < 1 or max_batch_chars < 1:
+            raise ValueError("max_batch_size and max_batch_chars must be positive.")
+        self._identify_many = identify_many
+        self._max_batch_size = max_batch_size
+        self._max_batch_chars = max_batch_chars
+        self._window = window
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._pending_chars = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"batches": 0, "items": 0}
+
+    async def identify(self, description: str) -> Any:
+        loop = asyncio.get_running_loop()
+        size = len(description)
+        if self._pending and self._pending_chars + size > self._max_batch_chars:
+            self._flush()
+        future = loop.create_future()
+        self._pending.append((description, future))
+        self._pending_chars += size
+        if (
+            len(self._pending) >= self._max_batch_size
+            or self._pending_chars >= self._max_batch_chars
+        ):
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_chars = self._pending, [], 0
+        if not batch:
+            return
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self._identify_many(
+                [description for description, _ in batch]
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,82 @@
+import re
+from typing import Dict, List, Mapping, Optional
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Plural suffixes stripped with "es" rather than "s" (boxes, tomatoes, dishes).
+_ES_SUFFIXES = ("ches", "shes", "sses", "xes", "zes", "oes")
+# Singulars ending in "ie", whose "-ies" plurals only drop the "s"
+# (cookies -> cookie, not cooky).
+_IE_SINGULARS = frozenset(
+    {
+        "brownie",
+        "calorie",
+        "cookie",
+        "hoagie",
+        "pastie",
+        "sarnie",
+        "smoothie",
+        "veggie",
+    }
+)
+# Words ending in "s" that are not plurals (hummus, couscous, asparagus, ...).
+_NON_PLURAL_SUFFIXES = ("ss", "us", "is")
+
+
+def singularize(token: str) -> str:
+    """Strips common English plural suffixes from a lower-case token."""
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        if token[:-1] in _IE_SINGULARS:
+            return token[:-1]
+        return token[:-3] + "y"
+    if token.endswith(_ES_SUFFIXES):
+        return token[:-2]
+    if token.endswith(_NON_PLURAL_SUFFIXES):
+        return token
+    return token[:-1]
+
+
+class QueryCanonicalizer:
+    """
+    Reduces free-text component queries to a canonical form so that
+    equivalent searches ("Chicken breasts", "chicken breast") share a key.
+
+    Canonicalisation case-folds, drops punctuation, singularises each token,
+    applies the synonym table and finally sorts the tokens. Synonym keys and
+    values are themselves canonicalised, so ``{"grilled chicken breast":
+    "chicken breast", "coke": "coca cola"}`` matches regardless of case or
+    plurals. Multi-word keys replace the whole query; single-word keys
+    replace individual tokens.
+    """
+
+    def __init__(
+        self, synonyms: Optional[Mapping[str, str]] = None, sort_tokens: bool = True
+    ):
+        self._sort_tokens = sort_tokens
+        self._phrase_synonyms: Dict[str, List[str]] = {}
+        self._token_synonyms: Dict[str, List[str]] = {}
+        for key, value in (synonyms or {}).items():
+            key_tokens = self._tokens(key)
+            value_tokens = self._tokens(value)
+            if not key_tokens:
+                continue
+            if len(key_tokens) == 1:
+                self._token_synonyms[key_tokens[0]] = value_tokens
+            else:
+                self._phrase_synonyms[" ".join(key_tokens)] = value_tokens
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        return [singularize(t) for t in _TOKEN_RE.findall(text.casefold())]
+
+    def canonicalize(self, text: Optional[str]) -> str:
+        tokens = self._tokens(text or "")
+        tokens = self._phrase_synonyms.get(" ".join(tokens), tokens)
+        expanded: List[str] = []
+        for token in tokens:
+            expanded.extend(self._token_synonyms.get(token, [token]))
+        if self._sort_tokens:
+            expanded.sort()
+        return " ".join(expanded)
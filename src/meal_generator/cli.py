@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+from typing import Dict, Iterable, Iterator, Optional, Set, TextIO
+
+from .generator import CircuitOpenError, MealGenerator
+from .resilience import is_retryable_error
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient_failure(error: BaseException) -> bool:
+    """
+    Whether a row failed because the provider was unavailable (open circuit
+    breaker, retries exhausted on a transient error) rather than because of
+    the row itself, so a resumed run should try it again.
+    """
+    if isinstance(error, CircuitOpenError) or is_retryable_error(error):
+        return True
+    cause = error.__cause__
+    return cause is not None and is_retryable_error(cause)
+
+
+class Checkpoint:
+    """
+    Tracks which input lines of a bulk run are finished.
+
+    Progress is stored as a watermark, the highest line number such that it
+    and every line before it are done, plus the set of finished lines above
+    the watermark (results complete out of order under concurrency). The
+    file is replaced atomically, so an interrupted run always leaves a
+    readable checkpoint behind.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self.watermark = 0
+        self._done_above: Set[int] = set()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.watermark = state["watermark"]
+            self._done_above = set(state.get("done", []))
+
+    def is_done(self, line: int) -> bool:
+        return line <= self.watermark or line in self._done_above
+
+    def mark_done(self, line: int) -> None:
+        self._done_above.add(line)
+        while self.watermark + 1 in self._done_above:
+            self.watermark += 1
+            self._done_above.remove(self.watermark)
+
+    def save(self) -> None:
+        if not self._path:
+            return
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"watermark": self.watermark, "done": sorted(self._done_above)}, f
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._path)
+
+
+async def process_jsonl(
+    generator: MealGenerator,
+    input_stream: TextIO,
+    output_stream: TextIO,
+    checkpoint: Optional[Checkpoint] = None,
+    country_code: str = "GB",
+    concurrency: int = 8,
+    field: str = "description",
+    id_field: Optional[str] = "id",
+    checkpoint_every: int = 100,
+    packed_identification: bool = False,
+) -> Dict[str, int]:
+    """
+    Generates a meal for every line of a JSONL stream and writes one JSON
+    result per line to ``output_stream``, in completion order.
+
+    Each input line is either a JSON string or an object holding the
+    description under ``field`` (and optionally an identifier under
+    ``id_field``). Every output record carries the input ``line`` number and
+    ``id`` plus either ``meal`` (``Meal.as_dict()``) or ``error``. Rows that
+    failed transiently (see ``is_transient_failure``) are also flagged
+    ``"retryable": true`` and are not marked done, so a resumed run retries
+    them. Input is
+    read lazily and at most ``concurrency`` rows are in flight, so memory
+    stays constant however long the input is.
+
+    Lines already recorded as done in ``checkpoint`` are skipped. Results are
+    written before the checkpoint is saved, so a crash can repeat at most the
+    rows finished since the last save, never lose one. The checkpoint is also
+    saved when the run is interrupted or cancelled.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    stats = {"processed": 0, "failed": 0, "retryable": 0, "skipped": 0}
+    rows: Dict[int, tuple] = {}
+    since_save = 0
+
+    def _write(record: dict) -> None:
+        output_stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _finish(line: int) -> None:
+        nonlocal since_save
+        checkpoint.mark_done(line)
+        since_save += 1
+        if since_save >= checkpoint_every:
+            output_stream.flush()
+            checkpoint.save()
+            since_save = 0
+
+    def _descriptions() -> Iterator[str]:
+        index = 0
+        for line, text in enumerate(input_stream, start=1):
+            if checkpoint.is_done(line):
+                stats["skipped"] += 1
+                continue
+            if not text.strip():
+                _finish(line)
+                continue
+            try:
+                record = json.loads(text)
+                if isinstance(record, str):
+                    description, row_id = record, None
+                else:
+                    description = record[field]
+                    row_id = record.get(id_field) if id_field else None
+                if not isinstance(description, str) or not description.strip():
+                    raise ValueError(f"'{field}' must be a non-empty string.")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                _write({"line": line, "id": None, "error": f"Invalid input: {e}"})
+                stats["failed"] += 1
+                _finish(line)
+                continue
+            rows[index] = (line, row_id)
+            index += 1
+            yield description
+
+    try:
+        async for result in generator.iter_meals_async(
+            _descriptions(), country_code, concurrency, packed_identification
+        ):
+            line, row_id = rows.pop(result.index)
+            if result.ok:
+                _write({"line": line, "id": row_id, "meal": result.result.as_dict()})
+                stats["processed"] += 1
+            elif is_transient_failure(result.error):
+                _write(
+                    {
+                        "line": line,
+                        "id": row_id,
+                        "error": str(result.error),
+                        "retryable": True,
+                    }
+                )
+                stats["failed"] += 1
+                stats["retryable"] += 1
+                continue
+            else:
+                _write({"line": line, "id": row_id, "error": str(result.error)})
+                stats["failed"] += 1
+            _finish(line)
+    finally:
+        output_stream.flush()
+        checkpoint.save()
+    return stats
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate meals for every line of a JSONL file, resumably."
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="JSONL input path, or '-' for stdin."
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="JSONL output path (appended to)."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint file; defaults to '<output>.checkpoint' for file output.",
+    )
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--country", default="GB")
+    parser.add_argument("--field", default="description")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--model", default=None)
+    parser.add_argument(
+        "--packed-identification",
+        action="store_true",
+        help="Pack concurrent identification calls into shared LLM calls.",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    checkpoint_path = args.checkpoint
+    if checkpoint_path is None and args.output != "-":
+        checkpoint_path = f"{args.output}.checkpoint"
+    checkpoint = Checkpoint(checkpoint_path)
+    if checkpoint.watermark:
+        logger.info(f"Resuming after line {checkpoint.watermark}.")
+
+    input_stream = (
+        sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    )
+    output_stream = (
+        sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    )
+
+    async def _run() -> Dict[str, int]:
+        # Treat SIGTERM like Ctrl-C: cancel the run so the checkpoint is saved.
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, asyncio.current_task().cancel
+            )
+        except (NotImplementedError, RuntimeError):
+            pass
+        async with MealGenerator(model_name=args.model) as generator:
+            return await process_jsonl(
+                generator,
+                input_stream,
+                output_stream,
+                checkpoint,
+                country_code=args.country,
+                concurrency=args.concurrency,
+                field=args.field,
+                id_field=args.id_field,
+                checkpoint_every=args.checkpoint_every,
+                packed_identification=args.packed_identification,
+            )
+
+    try:
+        stats = asyncio.run(_run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.warning(
+            f"Interrupted; progress saved. Resume after line {checkpoint.watermark} "
+            "by re-running the same command."
+        )
+        return 130
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    logger.info(
+        f"Done: {stats['processed']} processed, {stats['failed']} failed "
+        f"({stats['retryable']} will be retried on the next run), "
+        f"{stats['skipped']} skipped as already done."
+    )
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
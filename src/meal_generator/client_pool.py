@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from google import genai
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolMember:
+    def __init__(self, label: str, client: Any):
+        self.label = label
+        self.client = client
+        self.outstanding = 0
+        self.requests = 0
+        self.quota_ejections = 0
+        self.ejected_until = 0.0
+
+
+class ClientPool:
+    """
+    Balances model calls over several API keys (or pre-built clients).
+
+    Each call goes to the available client with the fewest requests in
+    flight. ``max_concurrency_per_key`` caps a single key's outstanding
+    requests; callers wait once every key is at its cap. A key that reports
+    quota exhaustion is ejected for the provider's Retry-After delay, or
+    ``ejection_time`` seconds, while the other keys carry the load.
+
+    A pool can be shared by any number of ``MealGenerator`` instances,
+    including generators driven from different threads and event loops.
+    """
+
+    def __init__(
+        self,
+        api_keys: Optional[Sequence[str]] = None,
+        clients: Optional[Sequence[Any]] = None,
+        max_concurrency_per_key: Optional[int] = 8,
+        ejection_time: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        members = [genai.Client(api_key=key) for key in api_keys or []]
+        members.extend(clients or [])
+        if not members:
+            raise ValueError("A ClientPool needs at least one API key or client.")
+        if max_concurrency_per_key is not None and max_concurrency_per_key < 1:
+            raise ValueError("max_concurrency_per_key must be at least 1.")
+        # Keys are never exposed; members are labelled by position instead.
+        self._members = [
+            _PoolMember(f"client-{index}", client)
+            for index, client in enumerate(members)
+        ]
+        self._max_concurrency = max_concurrency_per_key
+        self._ejection_time = ejection_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Waiters may belong to different event loops, so each is woken on
+        # its own loop via call_soon_threadsafe.
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @property
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            now = self._clock()
+            return [
+                {
+                    "client": member.label,
+                    "outstanding": member.outstanding,
+                    "requests": member.requests,
+                    "quota_ejections": member.quota_ejections,
+                    "ejected": member.ejected_until > now,
+                }
+                for member in self._members
+            ]
+
+    def has_available_client(self) -> bool:
+        """Whether any client is not currently ejected for quota exhaustion."""
+        with self._lock:
+            now = self._clock()
+            return any(member.ejected_until <= now for member in self._members)
+
+    def _pick(self, now: float) -> Tuple[Optional[_PoolMember], Optional[float]]:
+        """
+        Returns the least-loaded available member or, when none is available,
+        how long until an ejection ends (``None`` if only a release can help).
+        """
+        best: Optional[_PoolMember] = None
+        wake_in: Optional[float] = None
+        for member in self._members:
+            if member.ejected_until > now:
+                remaining = member.ejected_until - now
+                wake_in = remaining if wake_in is None else min(wake_in, remaining)
+                continue
+            if (
+                self._max_concurrency is not None
+                and member.outstanding >= self._max_concurrency
+            ):
+                continue
+            if best is None or member.outstanding < best.outstanding:
+                best = member
+        return best, wake_in
+
+    async def _acquire(self) -> _PoolMember:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                member, wake_in = self._pick(self._clock())
+                if member is not None:
+                    member.outstanding += 1
+                    member.requests += 1
+                    return member
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await asyncio.wait({waiter[1]}, timeout=wake_in)
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def _release(self, member: _PoolMember) -> None:
+        with self._lock:
+            member.outstanding -= 1
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # The waiter's loop has been closed; nobody is left to wake.
+                pass
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Waits for a client slot and yields the client to call."""
+        member = await self._acquire()
+        try:
+            yield member.client
+        finally:
+            self._release(member)
+
+    def report_quota_exhausted(
+        self, client: Any, retry_after: Optional[float] = None
+    ) -> None:
+        """Ejects ``client`` until its quota is expected to have recovered."""
+        delay = self._ejection_time if retry_after is None else retry_after
+        with self._lock:
+            for member in self._members:
+                if member.client is client:
+                    member.ejected_until = max(
+                        member.ejected_until, self._clock() + delay
+                    )
+                    member.quota_ejections += 1
+                    label = member.label
+                    break
+            else:
+                return
+        logger.warning(
+            f"Gemini quota exhausted for {label}; ejecting it for {delay:.1f}s."
+        )
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
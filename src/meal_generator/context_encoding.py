@@ -0,0 +1,111 @@
+import copy
+import json
+from typing import Any, Iterator, List, Optional
+
+
+class ContextEncoder:
+    """
+    Serialises retrieval context for embedding in a synthesis prompt.
+
+    By default the output is minified JSON with ``None`` values dropped and
+    floats rounded to ``precision`` decimal places (integral values lose their
+    trailing ``.0``). With ``tabular_examples`` each component's
+    ``contextual_examples`` list is written as ``{"columns": [...], "rows":
+    [[...], ...]}`` so field names appear once rather than once per example.
+    ``compact=False`` restores the original indented, lossless layout.
+    """
+
+    def __init__(
+        self,
+        precision: Optional[int] = 2,
+        tabular_examples: bool = False,
+        compact: bool = True,
+    ):
+        self._precision = precision
+        self._tabular_examples = tabular_examples
+        self._compact = compact
+
+    def encode(self, context: List[Any]) -> str:
+        if not self._compact:
+            return json.dumps(context, indent=2)
+        return json.dumps(
+            self._prepare(context), separators=(",", ":"), ensure_ascii=False
+        )
+
+    def _prepare(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            prepared = {}
+            for key, item in value.items():
+                if item is None:
+                    continue
+                if key == "contextual_examples" and self._tabular_examples:
+                    prepared[key] = self._tabulate(item)
+                else:
+                    prepared[key] = self._prepare(item)
+            return prepared
+        if isinstance(value, (list, tuple)):
+            return [self._prepare(item) for item in value if item is not None]
+        if isinstance(value, float):
+            return self._round(value)
+        return value
+
+    def _round(self, value: float) -> Any:
+        if self._precision is not None:
+            value = round(value, self._precision)
+        return int(value) if value.is_integer() else value
+
+    def _tabulate(self, examples: List[dict]) -> Any:
+        if not examples:
+            return self._prepare(examples)
+        columns: List[str] = []
+        for example in examples:
+            for key, item in example.items():
+                if item is not None and key not in columns:
+                    columns.append(key)
+        rows = [
+            [self._prepare(example.get(column)) for column in columns]
+            for example in examples
+        ]
+        return {"columns": columns, "rows": rows}
+
+
+# A rough, model-agnostic estimate; real tokenizers average ~4 chars per token
+# on English text and JSON.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of input tokens a prompt will use."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def iter_trimmed_contexts(context: List[dict]) -> Iterator[List[dict]]:
+    """
+    Yields progressively smaller copies of a retrieval context, least useful
+    detail first: contextual examples beyond the first, example brand strings,
+    source URLs and finally the remaining examples. The fields used to assign
+    data sources (``user_query`` and ``data_source``) are never removed.
+    """
+    trimmed = copy.deepcopy(context)
+    max_examples = max(
+        (len(item.get("contextual_examples") or []) for item in trimmed), default=0
+    )
+    for limit in range(max_examples - 1, 0, -1):
+        for item in trimmed:
+            if item.get("contextual_examples"):
+                del item["contextual_examples"][limit:]
+        yield copy.deepcopy(trimmed)
+
+    for item in trimmed:
+        item.pop("found_brand", None)
+        for example in item.get("contextual_examples") or []:
+            example.pop("brand", None)
+    yield copy.deepcopy(trimmed)
+
+    for item in trimmed:
+        item.pop("source_url", None)
+    yield copy.deepcopy(trimmed)
+
+    for item in trimmed:
+        item.pop("contextual_examples", None)
+    yield trimmed
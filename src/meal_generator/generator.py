@@ -1,9 +1,27 @@
 import html
-import json
 import logging
 import dataclasses
 import asyncio
-from typing import Any, Optional, List, Type, TypeVar
+import concurrent.futures
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    List,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from google import genai
 from google.genai import types
@@ -12,9 +30,29 @@ from pydantic import ValidationError, BaseModel
 from .meal import Meal
 from .meal_component import MealComponent
 from .retriever import Retriever
+from .llm_cache import LLMResponseCache
+from .cache import TTLCache
+from .batch import BatchResult, IdentificationBatcher, run_bounded
+from .streaming import JSONArrayItemParser
+from .client_pool import ClientPool
+from .background_loop import BackgroundLoop, get_default_background_loop
+from .transport import CassetteMissError
+from .resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    get_default_circuit_breaker,
+    is_quota_error,
+    is_client_error,
+    is_retryable_error,
+    retry_after_seconds,
+)
+from .context_encoding import ContextEncoder, estimate_tokens, iter_trimmed_contexts
 from .prompts import (
     IDENTIFY_AND_DECOMPOSE_PROMPT,
+    IDENTIFY_AND_DECOMPOSE_BATCH_PROMPT,
+    BATCH_USER_INPUT_TEMPLATE,
     HYBRID_SYNTHESIS_PROMPT,
+    FAST_SYNTHESIS_PROMPT,
     SYNTHESIZE_COMPONENTS_PROMPT,
 )
 from .models import (
@@ -22,33 +60,254 @@ from .models import (
     _GenerationStatus,
     _MealResponse,
     _IdentificationResponse,
+    _BatchIdentificationResponse,
     _ComponentListResponse,
     _ComponentsIdentified,
+    _Component,
+    _IdentifiedComponent,
     DataSource,
 )
 
 logger = logging.getLogger(__name__)
 
+# Resources handed out by MealGenerator.shared(), keyed by API key.
+_shared_lock = threading.Lock()
+_shared_clients: Dict[Optional[str], genai.Client] = {}
+_shared_retriever: Optional[Retriever] = None
+
 PydanticAIResponse = TypeVar("PydanticAIResponse", bound=_AIResponse)
 PydanticResult = TypeVar("PydanticResult", bound=BaseModel)
+T = TypeVar("T")
+IdentifyFn = Callable[[str], Awaitable[List[_IdentifiedComponent]]]
 
 
 class MealGenerationError(Exception):
     pass
 
 
+class CircuitOpenError(MealGenerationError):
+    """Raised without calling the model while the circuit breaker is open."""
+
+
 class MealGenerator:
     _MODEL_NAME = "gemini-3.5-flash"
+    # Upper bound on the description text packed into one identification call.
+    _MAX_PACKED_IDENTIFICATION_CHARS = 8000
+    # Stages that can be routed to their own model via ``stage_models``.
+    _ROUTABLE_STAGES = ("identify", "synthesize_meal", "synthesize_components")
+    # Internal stages that share a routable stage's model.
+    _STAGE_ROUTES = {"identify_batch": "identify", "fast_synthesis": "synthesize_meal"}
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: Optional[str] = None,
+        retriever: Optional[Retriever] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        meal_cache: Optional[TTLCache] = None,
+        stream_identification: bool = False,
+        context_encoder: Optional[ContextEncoder] = None,
+        max_prompt_tokens: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        stage_models: Optional[Dict[str, str]] = None,
+        fallback_model: Optional[str] = None,
+        fallback_after: Optional[float] = None,
+        client_pool: Optional[ClientPool] = None,
+        background_loop: Optional[BackgroundLoop] = None,
+        genai_client: Optional[genai.Client] = None,
+    ):
+        """
+        ``stage_models`` maps "identify", "synthesize_meal" and
+        "synthesize_components" to the model used for that stage (default
+        ``model_name``). With ``fallback_model``, a non-streaming call that
+        fails is retried on that model, and one still running after
+        ``fallback_after`` seconds is hedged: the fallback model is called too
+        and the first successful answer wins.
+
+        Each model has its own circuit breaker, so the fallback stays usable
+        while the primary's is open. ``circuit_breaker`` guards ``model_name``;
+        other models use the process-wide breaker for that model.
+
+        A ``client_pool`` spreads model calls over several API keys and
+        replaces the single client built from ``api_key``; ``genai_client``
+        supplies a ready-made client instead. Clients and a ``retriever``
+        passed in are not closed by ``aclose``.
 
-    def __init__(self, api_key: Optional[str] = None, model_name: Optional[str] = None):
-        if api_key:
+        The synchronous methods run on ``background_loop``, by default one
+        loop thread shared by the whole process.
+        """
+        unknown_stages = set(stage_models or {}) - set(self._ROUTABLE_STAGES)
+        if unknown_stages:
+            raise ValueError(f"Unknown model stages: {sorted(unknown_stages)}.")
+        self._client_pool = client_pool
+        self._owns_client = client_pool is None and genai_client is None
+        self._owns_retriever = retriever is None
+        if client_pool is not None:
+            self._genai_client = None
+        elif genai_client is not None:
+            self._genai_client = genai_client
+        elif api_key:
             self._genai_client = genai.Client(api_key=api_key)
         else:
             self._genai_client = genai.Client()
         self._model_name = model_name or self._MODEL_NAME
-        self._retriever = Retriever()
+        self._stage_models = dict(stage_models or {})
+        self._fallback_model = fallback_model
+        self._fallback_after = fallback_after
+        self._fallback_stats = {"hedged": 0, "fallbacks": 0, "fallback_wins": 0}
+        self._retriever = retriever or Retriever()
+        self._background_loop = background_loop or get_default_background_loop()
+        self._response_cache = response_cache
+        self._meal_cache = meal_cache
+        self._stream_identification = stream_identification
+        self._context_encoder = context_encoder or ContextEncoder()
+        self._max_prompt_tokens = max_prompt_tokens
+        self._usage_stats: Dict[str, Dict[str, int]] = {}
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        if circuit_breaker is not None:
+            self._circuit_breakers[self._model_name] = circuit_breaker
+        self._retry_stats = {
+            "attempts": 0,
+            "retries": 0,
+            "retries_exhausted": 0,
+            "circuit_rejections": 0,
+            "key_failovers": 0,
+        }
         logger.info(f"MealGenerator initialized for model '{self._model_name}'.")
 
+    @property
+    def usage_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-stage model usage: calls made, responses served from the response
+        cache, and the prompt, output and total token counts reported in each
+        response's ``usage_metadata``.
+        """
+        return {stage: dict(stats) for stage, stats in self._usage_stats.items()}
+
+    @property
+    def retry_stats(self) -> Dict[str, Any]:
+        """
+        Model call attempts, retries, calls that ran out of retries, calls
+        rejected by a circuit breaker, quota errors retried on another pooled
+        key, plus the state of ``model_name``'s breaker and of every model's
+        breaker used so far.
+        """
+        stats: Dict[str, Any] = dict(self._retry_stats)
+        stats["circuit_breaker"] = self._breaker_for(self._model_name).stats
+        stats["circuit_breakers"] = {
+            model: breaker.stats for model, breaker in self._circuit_breakers.items()
+        }
+        return stats
+
+    @property
+    def fallback_stats(self) -> Dict[str, int]:
+        """
+        Calls hedged after ``fallback_after``, calls sent to the fallback model
+        after the primary failed, and calls answered by the fallback model.
+        """
+        return dict(self._fallback_stats)
+
+    def _model_for(self, stage: str) -> str:
+        stage = self._STAGE_ROUTES.get(stage, stage)
+        return self._stage_models.get(stage, self._model_name)
+
+    def _stage_stats(self, stage: str) -> Dict[str, int]:
+        return self._usage_stats.setdefault(
+            stage,
+            {
+                "calls": 0,
+                "cache_hits": 0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+                "total_tokens": 0,
+            },
+        )
+
+    def _record_usage(self, stage: str, usage_metadata: Any) -> None:
+        stats = self._stage_stats(stage)
+        stats["calls"] += 1
+        if usage_metadata is None:
+            return
+        stats["prompt_tokens"] += usage_metadata.prompt_token_count or 0
+        stats["output_tokens"] += usage_metadata.candidates_token_count or 0
+        stats["total_tokens"] += usage_metadata.total_token_count or 0
+
+    @classmethod
+    def shared(cls, api_key: Optional[str] = None, **kwargs) -> "MealGenerator":
+        """
+        Returns a generator that reuses the process-wide genai client for
+        ``api_key`` and a process-wide Retriever, so short-lived generators
+        (e.g. one per request) skip client setup and find warm connections.
+        Closing a shared generator leaves the shared resources open; release
+        them at shutdown with ``aclose_shared``. Other keyword arguments are
+        passed to the constructor.
+        """
+        global _shared_retriever
+        with _shared_lock:
+            client = _shared_clients.get(api_key)
+            if client is None:
+                client = genai.Client(api_key=api_key) if api_key else genai.Client()
+                _shared_clients[api_key] = client
+            if "retriever" not in kwargs:
+                if _shared_retriever is None:
+                    _shared_retriever = Retriever()
+                kwargs["retriever"] = _shared_retriever
+        generator = cls(genai_client=client, **kwargs)
+        generator._owns_retriever = False
+        return generator
+
+    @classmethod
+    async def aclose_shared(cls) -> None:
+        """Closes the clients and Retriever handed out by ``shared``."""
+        global _shared_retriever
+        with _shared_lock:
+            clients = list(_shared_clients.values())
+            _shared_clients.clear()
+            retriever, _shared_retriever = _shared_retriever, None
+        for client in clients:
+            await client.aio.aclose()
+        if retriever is not None:
+            await retriever.aclose()
+
+    async def aclose(self) -> None:
+        """Releases pooled network resources held by the generator."""
+        if self._owns_retriever:
+            await self._retriever.aclose()
+        if self._owns_client:
+            await self._genai_client.aio.aclose()
+
+    async def __aenter__(self) -> "MealGenerator":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def __enter__(self) -> "MealGenerator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def warm_up_async(self) -> Dict[str, float]:
+        """
+        Opens the model client's connection ahead of the first real request by
+        making two lightweight model metadata calls. Returns their latencies as
+        ``cold_seconds`` (connection setup included) and ``warm_seconds``.
+        """
+        timings = {}
+        for label in ("cold_seconds", "warm_seconds"):
+            started = time.perf_counter()
+            async with self._client_slot() as client:
+                await client.aio.models.get(model=self._model_name)
+            timings[label] = time.perf_counter() - started
+        logger.info(
+            f"Warmed up model client: cold call {timings['cold_seconds']:.3f}s, "
+            f"warm call {timings['warm_seconds']:.3f}s."
+        )
+        return timings
+
     def _create_model_config(self, **kwargs) -> types.GenerationConfig:
         return types.GenerateContentConfig(
             safety_settings=[
@@ -74,22 +333,307 @@ class MealGenerator:
         )
 
     async def _call_ai_model_async(
-        self, prompt: str, config: types.GenerationConfig
+        self, prompt: str, config: types.GenerationConfig, stage: str = "other"
     ) -> str:
+        """Calls the model; ``stage`` names the pipeline step in ``usage_stats``."""
+        cache_key, cached = await self._get_cached_response(
+            self._model_for(stage), prompt, config
+        )
+        if cached is not None:
+            self._stage_stats(stage)["cache_hits"] += 1
+            return cached
+
+        response_text = await self._generate_content_async(prompt, config, stage)
+        await self._store_cached_response(cache_key, response_text, config)
+        return response_text
+
+    async def _stream_ai_model_async(
+        self, prompt: str, config: types.GenerationConfig, stage: str = "other"
+    ) -> AsyncIterator[str]:
+        """
+        Streams the model's response text. A cached response is yielded as a
+        single chunk; a complete streamed response is added to the cache.
+        """
+        cache_key, cached = await self._get_cached_response(
+            self._model_for(stage), prompt, config
+        )
+        if cached is not None:
+            self._stage_stats(stage)["cache_hits"] += 1
+            yield cached
+            return
+
+        chunks = []
+        async for chunk in self._generate_content_stream_async(prompt, config, stage):
+            chunks.append(chunk)
+            yield chunk
+        await self._store_cached_response(cache_key, "".join(chunks), config)
+
+    async def _get_cached_response(
+        self, model: str, prompt: str, config: types.GenerationConfig
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Returns the response cache key and the cached response, if any."""
+        if self._response_cache is None:
+            return None, None
+        cache_key = self._response_cache.make_key(model, prompt, config.response_schema)
+        cached = await self._response_cache.aget(cache_key)
+        if cached is not None:
+            logger.debug("Serving AI model response from the response cache.")
+        return cache_key, cached
+
+    async def _store_cached_response(
+        self,
+        cache_key: Optional[str],
+        response_text: Optional[str],
+        config: types.GenerationConfig,
+    ) -> None:
+        if cache_key is not None and self._is_cacheable(response_text, config):
+            await self._response_cache.aset(cache_key, response_text)
+
+    @staticmethod
+    def _is_cacheable(response_text: Optional[str], config: types.GenerationConfig):
+        """Only responses that validate against their schema are worth caching."""
+        if not response_text:
+            return False
+        schema = config.response_schema
+        if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+            return True
         try:
-            logger.debug("Sending async request to Generative AI model.")
-            response = await self._genai_client.aio.models.generate_content(
-                model=self._model_name,
-                contents=prompt,
-                config=config,
+            schema.model_validate_json(response_text)
+        except ValidationError:
+            return False
+        return True
+
+    async def _generate_content_async(
+        self, prompt: str, config: types.GenerationConfig, stage: str = "other"
+    ) -> str:
+        model = self._model_for(stage)
+        if self._fallback_model is None or self._fallback_model == model:
+            return await self._generate_with_model_async(model, prompt, config, stage)
+        return await self._generate_with_fallback_async(model, prompt, config, stage)
+
+    async def _generate_with_fallback_async(
+        self, model: str, prompt: str, config: types.GenerationConfig, stage: str
+    ) -> str:
+        """
+        Calls ``model``, falling back to ``self._fallback_model`` when it fails
+        and hedging with it when it has not answered after ``fallback_after``.
+        """
+        primary = asyncio.ensure_future(
+            self._generate_with_model_async(model, prompt, config, stage)
+        )
+        fallback: Optional[asyncio.Future] = None
+
+        def _start_fallback() -> asyncio.Future:
+            return asyncio.ensure_future(
+                self._generate_with_model_async(
+                    self._fallback_model, prompt, config, stage
+                )
             )
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._fallback_after)
+            if not done:
+                logger.info(
+                    f"'{model}' has not answered after {self._fallback_after}s; "
+                    f"hedging with '{self._fallback_model}'."
+                )
+                self._fallback_stats["hedged"] += 1
+                fallback = _start_fallback()
+            pending = {primary} if fallback is None else {primary, fallback}
+            primary_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is fallback:
+                            self._fallback_stats["fallback_wins"] += 1
+                        return task.result()
+                    if task is primary:
+                        primary_error = task.exception()
+                        if fallback is None:
+                            logger.warning(
+                                f"'{model}' failed; falling back to "
+                                f"'{self._fallback_model}'."
+                            )
+                            self._fallback_stats["fallbacks"] += 1
+                            fallback = _start_fallback()
+                            pending.add(fallback)
+            raise primary_error
+        finally:
+            for task in (primary, fallback):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _generate_with_model_async(
+        self, model: str, prompt: str, config: types.GenerationConfig, stage: str
+    ) -> str:
+        breaker = self._breaker_for(model)
+        attempt = 0
+        failovers = 0
+        failing_over = False
+        while True:
+            if not failing_over:
+                self._before_model_attempt(breaker)
+            failing_over = False
+            try:
+                logger.debug("Sending async request to Generative AI model.")
+                async with self._client_slot() as client:
+                    response = await client.aio.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=config,
+                    )
+            except Exception as e:
+                if self._fail_over_key(e, failovers):
+                    failovers += 1
+                    failing_over = True
+                    continue
+                delay = self._handle_model_error(breaker, e, attempt, "interaction")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            breaker.record_success()
             logger.debug("Received async response from Generative AI model.")
+            self._record_usage(stage, response.usage_metadata)
             return response.text
-        except Exception as e:
-            logger.error("Async AI model interaction failed.", exc_info=True)
-            raise MealGenerationError(
-                f"An unexpected error occurred during async AI model interaction: {e}"
-            ) from e
+
+    async def _generate_content_stream_async(
+        self, prompt: str, config: types.GenerationConfig, stage: str = "other"
+    ) -> AsyncIterator[str]:
+        # Streams are routed per stage but never hedged: text already handed
+        # to the caller cannot be swapped for another model's answer.
+        model = self._model_for(stage)
+        breaker = self._breaker_for(model)
+        attempt = 0
+        failovers = 0
+        failing_over = False
+        while True:
+            if not failing_over:
+                self._before_model_attempt(breaker)
+            failing_over = False
+            streamed = False
+            try:
+                logger.debug("Sending async streaming request to Generative AI model.")
+                async with self._client_slot() as client:
+                    stream = await client.aio.models.generate_content_stream(
+                        model=model,
+                        contents=prompt,
+                        config=config,
+                    )
+                    usage_metadata = None
+                    async for chunk in stream:
+                        # Usage is reported cumulatively; the last chunk has
+                        # the totals.
+                        usage_metadata = chunk.usage_metadata or usage_metadata
+                        if chunk.text:
+                            streamed = True
+                            yield chunk.text
+            except Exception as e:
+                # Text already handed to the caller cannot be taken back, so
+                # only a stream that failed before its first chunk is retried.
+                if not streamed and self._fail_over_key(e, failovers):
+                    failovers += 1
+                    failing_over = True
+                    continue
+                delay = self._handle_model_error(
+                    breaker, e, attempt, "streaming", can_retry=not streamed
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            breaker.record_success()
+            self._record_usage(stage, usage_metadata)
+            logger.debug("Finished streaming response from Generative AI model.")
+            return
+
+    @asynccontextmanager
+    async def _client_slot(self) -> AsyncIterator[genai.Client]:
+        """
+        Yields the client for one model call, taking a slot from the client
+        pool when there is one and ejecting keys that run out of quota.
+        """
+        if self._client_pool is None:
+            yield self._genai_client
+            return
+        async with self._client_pool.acquire() as client:
+            try:
+                yield client
+            except Exception as e:
+                if is_quota_error(e):
+                    self._client_pool.report_quota_exhausted(
+                        client, retry_after_seconds(e)
+                    )
+                raise
+
+    def _breaker_for(self, model: str) -> CircuitBreaker:
+        breaker = self._circuit_breakers.get(model)
+        if breaker is None:
+            breaker = self._circuit_breakers[model] = get_default_circuit_breaker(
+                model
+            )
+        return breaker
+
+    def _fail_over_key(self, error: Exception, failovers: int) -> bool:
+        """
+        Whether a quota error can be retried at once on another pooled key.
+        The exhausted key has already been ejected by ``_client_slot``; the
+        error only counts against the model's breaker once no key is left
+        (or every key has been tried for this call).
+        """
+        if (
+            self._client_pool is None
+            or not is_quota_error(error)
+            or failovers >= len(self._client_pool) - 1
+            or not self._client_pool.has_available_client()
+        ):
+            return False
+        self._retry_stats["key_failovers"] += 1
+        logger.info("API key ran out of quota; retrying on another pooled key.")
+        return True
+
+    def _before_model_attempt(self, breaker: CircuitBreaker) -> None:
+        if not breaker.allow():
+            self._retry_stats["circuit_rejections"] += 1
+            raise CircuitOpenError(
+                "The AI model is unavailable (circuit breaker open); failing fast."
+            )
+        self._retry_stats["attempts"] += 1
+
+    def _handle_model_error(
+        self,
+        breaker: CircuitBreaker,
+        error: Exception,
+        attempt: int,
+        action: str,
+        can_retry: bool = True,
+    ) -> float:
+        """
+        Records a failed model call and returns the delay before retrying it.
+        Raises ``MealGenerationError`` when the error is not retryable or the
+        retry budget is spent.
+        """
+        retryable = is_retryable_error(error)
+        if retryable:
+            breaker.record_failure()
+        elif is_client_error(error):
+            # The provider answered; the request itself was at fault.
+            breaker.record_success()
+        if retryable and can_retry and attempt < self._retry_policy.max_retries:
+            delay = self._retry_policy.delay(attempt, retry_after_seconds(error))
+            self._retry_stats["retries"] += 1
+            logger.warning(
+                f"Retryable AI model {action} error ({error}); retrying in "
+                f"{delay:.2f}s (attempt {attempt + 1}/{self._retry_policy.max_retries})."
+            )
+            return delay
+        if retryable:
+            self._retry_stats["retries_exhausted"] += 1
+        logger.error(f"Async AI model {action} failed.", exc_info=True)
+        raise MealGenerationError(
+            f"An unexpected error occurred during async AI model {action}: {error}"
+        ) from error
 
     def _process_response(
         self, pydantic_response_model: Type[PydanticAIResponse], json_str: str
@@ -115,23 +659,42 @@ class MealGenerator:
     async def generate_meal_async(
         self, natural_language_string: str, country_code: str = "GB"
     ) -> Meal:
+        return await self._generate_meal_async(natural_language_string, country_code)
+
+    async def _generate_meal_async(
+        self,
+        natural_language_string: str,
+        country_code: str,
+        identify: Optional[IdentifyFn] = None,
+    ) -> Meal:
+        """
+        Runs the meal pipeline. ``identify`` replaces the single-description
+        identification call, e.g. with a packed batch identifier.
+        """
         logger.info(
             f"Starting async meal generation for query: '{natural_language_string}'"
         )
+        cache_key = self._meal_cache_key(natural_language_string, country_code)
+        if self._meal_cache is not None:
+            cached = self._meal_cache.get(cache_key, None)
+            if cached is not None:
+                logger.info("Serving meal from the meal cache.")
+                return Meal.from_dict(self._without_ids(cached))
         try:
             context_for_synthesis, _ = await self._identify_and_retrieve_async(
-                natural_language_string, country_code
+                natural_language_string, country_code, identify
             )
 
             logger.info("Step 3: Synthesizing final meal object.")
-            synth_prompt = HYBRID_SYNTHESIS_PROMPT.format(
-                natural_language_string=html.escape(natural_language_string),
-                country_ISO_3166_2=html.escape(country_code),
-                context_data_json=json.dumps(context_for_synthesis, indent=2),
+            synth_prompt = self._render_synthesis_prompt(
+                HYBRID_SYNTHESIS_PROMPT,
+                natural_language_string,
+                country_code,
+                context_for_synthesis,
             )
             synth_config = self._create_model_config(response_schema=_MealResponse)
             final_response_str = await self._call_ai_model_async(
-                synth_prompt, synth_config
+                synth_prompt, synth_config, stage="synthesize_meal"
             )
 
             pydantic_meal = self._process_response(_MealResponse, final_response_str)
@@ -139,43 +702,347 @@ class MealGenerator:
 
             self._post_process_meal(final_meal, context_for_synthesis)
             logger.info("Successfully generated final meal object.")
+            if self._meal_cache is not None:
+                self._meal_cache.set(cache_key, final_meal.as_dict())
             return final_meal
         except Exception as e:
             logger.error("Async meal generation pipeline failed.", exc_info=True)
             raise e
 
+    async def generate_meal_fast_async(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Meal:
+        """
+        Generates a meal with a single LLM call, skipping identification and
+        retrieval. Every component is marked ``estimated_model``. A grounded meal
+        already in the meal cache is returned instead when available.
+        """
+        logger.info(
+            f"Starting fast meal generation for query: '{natural_language_string}'"
+        )
+        if self._meal_cache is not None:
+            cache_key = self._meal_cache_key(natural_language_string, country_code)
+            cached = self._meal_cache.get(cache_key, None)
+            if cached is not None:
+                logger.info("Serving meal from the meal cache.")
+                return Meal.from_dict(self._without_ids(cached))
+        try:
+            prompt = FAST_SYNTHESIS_PROMPT.format(
+                natural_language_string=html.escape(natural_language_string),
+                country_ISO_3166_2=html.escape(country_code),
+            )
+            config = self._create_model_config(response_schema=_MealResponse)
+            response_str = await self._call_ai_model_async(
+                prompt, config, stage="fast_synthesis"
+            )
+
+            pydantic_meal = self._process_response(_MealResponse, response_str)
+            meal = Meal.from_pydantic(pydantic_meal)
+            for component in meal.component_list:
+                component.nutrient_profile = dataclasses.replace(
+                    component.nutrient_profile, data_source=DataSource.ESTIMATED_MODEL
+                )
+            meal.nutrient_profile = meal._calculate_aggregate_nutrients()
+            logger.info("Successfully generated fast meal object.")
+            return meal
+        except Exception as e:
+            logger.error("Fast meal generation failed.", exc_info=True)
+            raise e
+
+    async def generate_meal_with_refinement_async(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Tuple[Meal, "asyncio.Task[Meal]"]:
+        """
+        Returns a fast, ungrounded meal together with a background task that
+        resolves to the fully grounded meal from ``generate_meal_async``. Both
+        pipelines start immediately; the caller owns the refine task and should
+        await or cancel it.
+        """
+        refine_task = asyncio.ensure_future(
+            self.generate_meal_async(natural_language_string, country_code)
+        )
+        try:
+            fast_meal = await self.generate_meal_fast_async(
+                natural_language_string, country_code
+            )
+        except BaseException:
+            refine_task.cancel()
+            raise
+        return fast_meal, refine_task
+
+    async def generate_meals_async(
+        self,
+        natural_language_strings: Iterable[str],
+        country_code: str = "GB",
+        concurrency: int = 8,
+        packed_identification: bool = False,
+    ) -> List[BatchResult[Meal]]:
+        """
+        Generates a meal for each description with at most ``concurrency``
+        pipelines in flight. Results are returned in input order; a failed item
+        carries its exception in ``error`` rather than aborting the batch.
+
+        With ``packed_identification``, the identification step of concurrent
+        pipelines is packed into shared LLM calls (see ``identify_batch_async``).
+        """
+        results = [
+            result
+            async for result in self.iter_meals_async(
+                natural_language_strings,
+                country_code,
+                concurrency,
+                packed_identification,
+            )
+        ]
+        return sorted(results, key=lambda result: result.index)
+
+    def iter_meals_async(
+        self,
+        natural_language_strings: Iterable[str],
+        country_code: str = "GB",
+        concurrency: int = 8,
+        packed_identification: bool = False,
+    ) -> AsyncIterator[BatchResult[Meal]]:
+        """
+        Like ``generate_meals_async`` but yields each result as soon as it
+        completes. ``BatchResult.index`` gives the item's input position.
+        """
+        logger.info(f"Starting batch meal generation (concurrency={concurrency}).")
+        if not packed_identification:
+            return run_bounded(
+                natural_language_strings,
+                lambda description: self.generate_meal_async(description, country_code),
+                concurrency,
+            )
+        batcher = IdentificationBatcher(
+            self.identify_batch_async,
+            max_batch_size=concurrency,
+            max_batch_chars=self._MAX_PACKED_IDENTIFICATION_CHARS,
+        )
+        return run_bounded(
+            natural_language_strings,
+            lambda description: self._generate_meal_async(
+                description, country_code, batcher.identify
+            ),
+            concurrency,
+        )
+
+    async def identify_batch_async(
+        self, natural_language_strings: List[str]
+    ) -> List[Union[List[_IdentifiedComponent], Exception]]:
+        """
+        Identifies the components of several descriptions in one LLM call.
+        Returns, in input order, each description's components or the
+        ``MealGenerationError`` explaining why it could not be identified.
+        """
+        logger.info(
+            f"Identifying {len(natural_language_strings)} descriptions in one call."
+        )
+        user_inputs = "\n".join(
+            BATCH_USER_INPUT_TEMPLATE.format(
+                index=index, natural_language_string=html.escape(description)
+            )
+            for index, description in enumerate(natural_language_strings)
+        )
+        id_prompt = IDENTIFY_AND_DECOMPOSE_BATCH_PROMPT.format(user_inputs=user_inputs)
+        id_config = self._create_model_config(
+            response_schema=_BatchIdentificationResponse
+        )
+        id_response_str = await self._call_ai_model_async(
+            id_prompt, id_config, stage="identify_batch"
+        )
+        pydantic_result = self._process_response(
+            _BatchIdentificationResponse, id_response_str
+        )
+
+        by_index = {item.index: item for item in pydantic_result.descriptions}
+        results: List[Union[List[_IdentifiedComponent], Exception]] = []
+        for index in range(len(natural_language_strings)):
+            item = by_index.get(index)
+            if item is None:
+                results.append(
+                    MealGenerationError(
+                        f"No identification was returned for batch item {index}."
+                    )
+                )
+            elif item.status == _GenerationStatus.BAD_INPUT:
+                results.append(
+                    MealGenerationError("Input was determined to be malicious.")
+                )
+            else:
+                results.append(item.components)
+        return results
+
+    @staticmethod
+    def _meal_cache_key(natural_language_string: str, country_code: str) -> tuple:
+        return (" ".join(natural_language_string.casefold().split()), country_code)
+
+    @staticmethod
+    def _without_ids(meal_dict: dict) -> dict:
+        """Strips ids from a cached meal dict so each hit gets fresh ones."""
+        fresh = {k: v for k, v in meal_dict.items() if k != "id"}
+        fresh["components"] = [
+            {k: v for k, v in component.items() if k != "id"}
+            for component in meal_dict["components"]
+        ]
+        return fresh
+
+    # --- Synchronous API ---
+    # Each method runs its async counterpart on a long-lived background event
+    # loop, so pooled connections survive between calls and the methods work
+    # even when the calling thread is already running an event loop.
+
+    def _run_sync(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self._background_loop.run(coro)
+
+    def generate_meal(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Meal:
+        """Synchronous wrapper for generate_meal_async."""
+        return self._run_sync(
+            self.generate_meal_async(natural_language_string, country_code)
+        )
+
+    def generate_meal_fast(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Meal:
+        """Synchronous wrapper for generate_meal_fast_async."""
+        return self._run_sync(
+            self.generate_meal_fast_async(natural_language_string, country_code)
+        )
+
+    def generate_meal_with_refinement(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Tuple[Meal, "concurrent.futures.Future[Meal]"]:
+        """
+        Synchronous wrapper for generate_meal_with_refinement_async. The
+        grounded meal is delivered through a ``concurrent.futures.Future``.
+        """
+
+        async def _await_refinement(refine_task: "asyncio.Task[Meal]") -> Meal:
+            return await refine_task
+
+        async def _start() -> Tuple[Meal, "concurrent.futures.Future[Meal]"]:
+            fast_meal, refine_task = await self.generate_meal_with_refinement_async(
+                natural_language_string, country_code
+            )
+            # Cancelling the returned future cancels the refinement too.
+            refined = self._background_loop.submit(_await_refinement(refine_task))
+            return fast_meal, refined
+
+        return self._run_sync(_start())
+
+    def generate_meals(
+        self,
+        natural_language_strings: Iterable[str],
+        country_code: str = "GB",
+        concurrency: int = 8,
+        packed_identification: bool = False,
+    ) -> List[BatchResult[Meal]]:
+        """Synchronous wrapper for generate_meals_async."""
+        return self._run_sync(
+            self.generate_meals_async(
+                natural_language_strings,
+                country_code,
+                concurrency,
+                packed_identification,
+            )
+        )
+
+    def iter_meals(
+        self,
+        natural_language_strings: Iterable[str],
+        country_code: str = "GB",
+        concurrency: int = 8,
+        packed_identification: bool = False,
+    ) -> Iterator[BatchResult[Meal]]:
+        """Synchronous wrapper for iter_meals_async."""
+        return self._background_loop.iterate(
+            self.iter_meals_async(
+                natural_language_strings,
+                country_code,
+                concurrency,
+                packed_identification,
+            )
+        )
+
+    def identify_batch(
+        self, natural_language_strings: List[str]
+    ) -> List[Union[List[_IdentifiedComponent], Exception]]:
+        """Synchronous wrapper for identify_batch_async."""
+        return self._run_sync(self.identify_batch_async(natural_language_strings))
+
     def generate_component(
         self, natural_language_string: str, country_code: str = "GB"
     ) -> List[MealComponent]:
         """Synchronous wrapper for generate_component_async."""
         logger.info("Running generate_component synchronously.")
-        return asyncio.run(
+        return self._run_sync(
             self.generate_component_async(natural_language_string, country_code)
         )
 
+    def stream_meal(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Iterator[Union[MealComponent, Meal]]:
+        """Synchronous wrapper for stream_meal_async."""
+        return self._background_loop.iterate(
+            self.stream_meal_async(natural_language_string, country_code)
+        )
+
+    def stream_components(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> Iterator[MealComponent]:
+        """Synchronous wrapper for stream_components_async."""
+        return self._background_loop.iterate(
+            self.stream_components_async(natural_language_string, country_code)
+        )
+
+    def close(self) -> None:
+        """Synchronous wrapper for aclose."""
+        self._run_sync(self.aclose())
+
+    def warm_up(self) -> Dict[str, float]:
+        """Synchronous wrapper for warm_up_async."""
+        return self._run_sync(self.warm_up_async())
+
     async def generate_component_async(
         self, natural_language_string: str, country_code: str = "GB"
     ) -> List[MealComponent]:
         """Generates a list of MealComponents from a natural language string."""
+        return await self._generate_component_async(
+            natural_language_string, country_code
+        )
+
+    async def _generate_component_async(
+        self,
+        natural_language_string: str,
+        country_code: str,
+        identify: Optional[IdentifyFn] = None,
+    ) -> List[MealComponent]:
+        """
+        Runs the component pipeline. ``identify`` replaces the single-description
+        identification call, as in ``_generate_meal_async``.
+        """
         logger.info(
             f"Starting async component generation for query: '{natural_language_string}'"
         )
         try:
             context_for_synthesis, _ = await self._identify_and_retrieve_async(
-                natural_language_string, country_code
+                natural_language_string, country_code, identify
             )
 
             logger.info("Step 3: Synthesizing new component object(s).")
-            synth_prompt = SYNTHESIZE_COMPONENTS_PROMPT.format(
-                natural_language_string=html.escape(natural_language_string),
-                country_ISO_3166_2=html.escape(country_code),
-                context_data_json=json.dumps(context_for_synthesis, indent=2),
+            synth_prompt = self._render_synthesis_prompt(
+                SYNTHESIZE_COMPONENTS_PROMPT,
+                natural_language_string,
+                country_code,
+                context_for_synthesis,
             )
             synth_config = self._create_model_config(
                 response_schema=_ComponentListResponse
             )
             final_response_str = await self._call_ai_model_async(
-                synth_prompt, synth_config
+                synth_prompt, synth_config, stage="synthesize_components"
             )
 
             pydantic_result = self._process_response(
@@ -194,21 +1061,218 @@ class MealGenerator:
             logger.error("Async component generation pipeline failed.", exc_info=True)
             raise e
 
-    async def _identify_and_retrieve_async(
-        self, natural_language_string: str, country_code: str
-    ) -> tuple[list, list]:
-        """Helper to run the shared identification and retrieval steps."""
-        logger.info("Step 1: Identifying and decomposing components.")
+    async def stream_components_async(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> AsyncIterator[MealComponent]:
+        """
+        Like ``generate_component_async`` but streams the synthesis step,
+        yielding each MealComponent as soon as the model has generated it.
+        """
+        logger.info(
+            f"Starting streamed component generation for query: '{natural_language_string}'"
+        )
+        context_for_synthesis, _ = await self._identify_and_retrieve_async(
+            natural_language_string, country_code
+        )
+
+        logger.info("Step 3: Streaming new component object(s).")
+        synth_prompt = self._render_synthesis_prompt(
+            SYNTHESIZE_COMPONENTS_PROMPT,
+            natural_language_string,
+            country_code,
+            context_for_synthesis,
+        )
+        synth_config = self._create_model_config(response_schema=_ComponentListResponse)
+        parser = JSONArrayItemParser("components")
+        streamed = 0
+        async for component in self._stream_synthesized_components_async(
+            synth_prompt,
+            synth_config,
+            parser,
+            context_for_synthesis,
+            stage="synthesize_components",
+        ):
+            streamed += 1
+            yield component
+
+        pydantic_result = self._process_response(_ComponentListResponse, parser.text)
+        for pydantic_component in pydantic_result.components[streamed:]:
+            yield self._synthesized_component(pydantic_component, context_for_synthesis)
+        logger.info(
+            f"Successfully streamed {len(pydantic_result.components)} new component(s)."
+        )
+
+    async def stream_meal_async(
+        self, natural_language_string: str, country_code: str = "GB"
+    ) -> AsyncIterator[Union[MealComponent, Meal]]:
+        """
+        Like ``generate_meal_async`` but streams the synthesis step. Each
+        MealComponent is yielded as soon as the model has generated it; the
+        final item is the complete Meal, built from the same component objects
+        and carrying the aggregate nutrient profile.
+        """
+        logger.info(
+            f"Starting streamed meal generation for query: '{natural_language_string}'"
+        )
+        cache_key = self._meal_cache_key(natural_language_string, country_code)
+        if self._meal_cache is not None:
+            cached = self._meal_cache.get(cache_key, None)
+            if cached is not None:
+                logger.info("Serving meal from the meal cache.")
+                meal = Meal.from_dict(self._without_ids(cached))
+                for component in meal.component_list:
+                    yield component
+                yield meal
+                return
+
+        context_for_synthesis, _ = await self._identify_and_retrieve_async(
+            natural_language_string, country_code
+        )
+
+        logger.info("Step 3: Streaming final meal object.")
+        synth_prompt = self._render_synthesis_prompt(
+            HYBRID_SYNTHESIS_PROMPT,
+            natural_language_string,
+            country_code,
+            context_for_synthesis,
+        )
+        synth_config = self._create_model_config(response_schema=_MealResponse)
+        parser = JSONArrayItemParser("components")
+        components: List[MealComponent] = []
+        async for component in self._stream_synthesized_components_async(
+            synth_prompt,
+            synth_config,
+            parser,
+            context_for_synthesis,
+            stage="synthesize_meal",
+        ):
+            components.append(component)
+            yield component
+
+        pydantic_meal = self._process_response(_MealResponse, parser.text)
+        # The validated response is authoritative; emit any components the
+        # incremental parser could not use.
+        for pydantic_component in pydantic_meal.components[len(components) :]:
+            component = self._synthesized_component(
+                pydantic_component, context_for_synthesis
+            )
+            components.append(component)
+            yield component
+
+        final_meal = Meal(
+            name=pydantic_meal.name,
+            description=pydantic_meal.description,
+            meal_type=pydantic_meal.type,
+            component_list=components,
+        )
+        logger.info("Successfully streamed final meal object.")
+        if self._meal_cache is not None:
+            self._meal_cache.set(cache_key, final_meal.as_dict())
+        yield final_meal
+
+    async def _stream_synthesized_components_async(
+        self,
+        prompt: str,
+        config: types.GenerationConfig,
+        parser: JSONArrayItemParser,
+        context: list,
+        stage: str,
+    ) -> AsyncIterator[MealComponent]:
+        """
+        Streams a synthesis response through ``parser``, yielding each component
+        that validates on its own. The caller validates ``parser.text`` once
+        the stream ends.
+        """
+        async for chunk in self._stream_ai_model_async(prompt, config, stage):
+            for item in parser.feed(chunk):
+                try:
+                    pydantic_component = _Component.model_validate_json(item)
+                except ValidationError:
+                    # Left for the caller's final validation to report.
+                    continue
+                yield self._synthesized_component(pydantic_component, context)
+
+    def _synthesized_component(
+        self, pydantic_component: _Component, context: list
+    ) -> MealComponent:
+        component = MealComponent.from_pydantic(pydantic_component)
+        self._assign_data_source(component, self._data_source_map(context))
+        return component
+
+    def _render_synthesis_prompt(
+        self,
+        template: str,
+        natural_language_string: str,
+        country_code: str,
+        context: list,
+    ) -> str:
+        """
+        Renders a synthesis prompt. When ``max_prompt_tokens`` is set and the
+        estimated prompt size exceeds it, the embedded context is trimmed step
+        by step (see ``iter_trimmed_contexts``) until the prompt fits.
+        """
+
+        def _render(context_for_prompt: list) -> str:
+            return template.format(
+                natural_language_string=html.escape(natural_language_string),
+                country_ISO_3166_2=html.escape(country_code),
+                context_data_json=self._context_encoder.encode(context_for_prompt),
+            )
+
+        prompt = _render(context)
+        if self._max_prompt_tokens is None:
+            return prompt
+        estimated = estimate_tokens(prompt)
+        if estimated <= self._max_prompt_tokens:
+            return prompt
+        for trimmed_context in iter_trimmed_contexts(context):
+            prompt = _render(trimmed_context)
+            if estimate_tokens(prompt) <= self._max_prompt_tokens:
+                break
+        trimmed_estimate = estimate_tokens(prompt)
+        if trimmed_estimate > self._max_prompt_tokens:
+            logger.warning(
+                f"Synthesis prompt (~{trimmed_estimate} tokens) exceeds the budget "
+                f"of {self._max_prompt_tokens} tokens even with context trimmed."
+            )
+        else:
+            logger.info(
+                f"Trimmed synthesis context from ~{estimated} to ~{trimmed_estimate} "
+                f"tokens to fit the budget of {self._max_prompt_tokens}."
+            )
+        return prompt
+
+    async def _identify_async(
+        self, natural_language_string: str
+    ) -> List[_IdentifiedComponent]:
+        """Identifies the components of a single description."""
         id_prompt = IDENTIFY_AND_DECOMPOSE_PROMPT.format(
             natural_language_string=html.escape(natural_language_string)
         )
         id_config = self._create_model_config(response_schema=_IdentificationResponse)
-        id_response_str = await self._call_ai_model_async(id_prompt, id_config)
+        id_response_str = await self._call_ai_model_async(
+            id_prompt, id_config, stage="identify"
+        )
 
         pydantic_result: _ComponentsIdentified = self._process_response(
             _IdentificationResponse, id_response_str
         )
-        identified_components = pydantic_result.components
+        return pydantic_result.components
+
+    async def _identify_and_retrieve_async(
+        self,
+        natural_language_string: str,
+        country_code: str,
+        identify: Optional[IdentifyFn] = None,
+    ) -> tuple[list, list]:
+        """Helper to run the shared identification and retrieval steps."""
+        logger.info("Step 1: Identifying and decomposing components.")
+        if identify is None and self._stream_identification:
+            return await self._identify_and_retrieve_streaming_async(
+                natural_language_string, country_code
+            )
+        identify = identify or self._identify_async
+        identified_components = await identify(natural_language_string)
 
         logger.info(
             f"Identified {len(identified_components)} individual components to process."
@@ -223,33 +1287,91 @@ class MealGenerator:
         )
         return context_for_synthesis, identified_components
 
+    async def _identify_and_retrieve_streaming_async(
+        self, natural_language_string: str, country_code: str
+    ) -> tuple[list, list]:
+        """
+        Streams the identification response and starts each component's
+        retrieval as soon as that component has been generated, overlapping
+        retrieval with the rest of the model's output.
+        """
+        id_prompt = IDENTIFY_AND_DECOMPOSE_PROMPT.format(
+            natural_language_string=html.escape(natural_language_string)
+        )
+        id_config = self._create_model_config(response_schema=_IdentificationResponse)
+        parser = JSONArrayItemParser("components")
+        retrieval_tasks: List[asyncio.Future] = []
+
+        def _start_retrieval(component: _IdentifiedComponent) -> None:
+            retrieval_tasks.append(
+                asyncio.ensure_future(
+                    self._retriever.process_component_async(component, country_code)
+                )
+            )
+
+        try:
+            async for chunk in self._stream_ai_model_async(
+                id_prompt, id_config, stage="identify"
+            ):
+                for item in parser.feed(chunk):
+                    try:
+                        component = _IdentifiedComponent.model_validate_json(item)
+                    except ValidationError:
+                        # Left for the final validation below to report.
+                        continue
+                    logger.debug(f"Streamed component '{component.query}'.")
+                    _start_retrieval(component)
+
+            pydantic_result: _ComponentsIdentified = self._process_response(
+                _IdentificationResponse, parser.text
+            )
+            identified_components = pydantic_result.components
+            # The validated response is authoritative; start any components the
+            # incremental parser could not use.
+            for component in identified_components[len(retrieval_tasks) :]:
+                _start_retrieval(component)
+            logger.info(
+                f"Identified {len(identified_components)} individual components to process."
+            )
+            results = await asyncio.gather(*retrieval_tasks, return_exceptions=True)
+        except BaseException:
+            for task in retrieval_tasks:
+                task.cancel()
+            raise
+        for result in results:
+            if isinstance(result, CassetteMissError):
+                raise result
+
+        context_for_synthesis = [r for r in results if not isinstance(r, BaseException)]
+        logger.info(
+            f"Context retrieval complete. Found data for {len(context_for_synthesis)} components."
+        )
+        return context_for_synthesis, identified_components
+
     def _post_process_meal(self, meal: Meal, context: list):
         """Helper to assign data sources to a full meal object."""
         logger.info(
             "Post-processing: Assigning deterministic data sources to final components."
         )
-        data_source_map = {
-            item.get("user_query"): item.get("data_source") for item in context
-        }
+        data_source_map = self._data_source_map(context)
         for component in meal.component_list:
-            source_str = data_source_map.get(component.name)
-            if source_str:
-                source_enum = DataSource(source_str)
-                updated_profile = dataclasses.replace(
-                    component.nutrient_profile, data_source=source_enum
-                )
-                component.nutrient_profile = updated_profile
+            self._assign_data_source(component, data_source_map)
         meal.nutrient_profile = meal._calculate_aggregate_nutrients()
 
     def _post_process_components(self, components: List[MealComponent], context: list):
         """Helper to assign data sources to a list of components."""
-        data_source_map = {
-            item.get("user_query"): item.get("data_source") for item in context
-        }
+        data_source_map = self._data_source_map(context)
         for component in components:
-            source = data_source_map.get(component.name)
-            if source:
-                updated_profile = dataclasses.replace(
-                    component.nutrient_profile, data_source=source
-                )
-                component.nutrient_profile = updated_profile
+            self._assign_data_source(component, data_source_map)
+
+    @staticmethod
+    def _data_source_map(context: list) -> dict:
+        return {item.get("user_query"): item.get("data_source") for item in context}
+
+    @staticmethod
+    def _assign_data_source(component: MealComponent, data_source_map: dict) -> None:
+        source_str = data_source_map.get(component.name)
+        if source_str:
+            component.nutrient_profile = dataclasses.replace(
+                component.nutrient_profile, data_source=DataSource(source_str)
+            )
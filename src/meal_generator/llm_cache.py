@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class LLMResponseCache:
+    """
+    A persistent, SQLite-backed cache of raw model responses.
+
+    Entries are keyed on the model name, a hash of the rendered prompt and the
+    response schema, so a prompt or schema change never serves a stale shape.
+    Entries expire after ``ttl`` seconds, and the least recently used entries
+    are evicted once the stored responses exceed ``max_bytes``.
+
+    Replicas can open a cache populated elsewhere with ``read_only=True``;
+    they serve hits but never write, expire or evict.
+
+    The stored size is tracked as a running total, so writes only scan for
+    LRU victims when over budget. Expired entries are swept (and the total
+    re-synced with the file) at most every ``sweep_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 7 * 24 * 3600.0,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        read_only: bool = False,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._path = path
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._read_only = read_only
+        self._sweep_interval = sweep_interval
+        self._clock = clock
+        self._total_bytes = 0
+        self._last_sweep: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        if read_only:
+            self._connection = sqlite3.connect(
+                f"file:{path}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses(accessed_at)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created_at "
+                "ON responses(created_at)"
+            )
+            self._connection.commit()
+            self._total_bytes = self._stored_bytes()
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def make_key(model: str, prompt: str, response_schema: Any = None) -> str:
+        """Builds the cache key for a model, rendered prompt and response schema."""
+        if hasattr(response_schema, "model_json_schema"):
+            schema = response_schema.model_json_schema()
+        else:
+            schema = response_schema
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps(
+            [model, prompt_hash, schema], sort_keys=True, default=str
+        ).encode("utf-8")
+        return hashlib.sha256(material).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self._ttl is not None and row[1] + self._ttl <= now):
+                self._stats["misses"] += 1
+                if row is not None and not self._read_only:
+                    with self._connection:
+                        self._delete_key(key)
+                return None
+            self._stats["hits"] += 1
+            if not self._read_only:
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                        (now, key),
+                    )
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        if self._read_only:
+            return
+        now = self._clock()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._connection:
+            self._delete_key(key)
+            self._connection.execute(
+                "INSERT INTO responses "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._total_bytes += size
+            self._stats["writes"] += 1
+            if (
+                self._last_sweep is None
+                or now - self._last_sweep >= self._sweep_interval
+            ):
+                self._sweep(now)
+            self._evict()
+
+    def _stored_bytes(self) -> int:
+        (total,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return total
+
+    def _delete_key(self, key: str) -> None:
+        row = self._connection.execute(
+            "SELECT size FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= row[0]
+
+    def _sweep(self, now: float) -> None:
+        """Drops expired entries and re-syncs the running size with the file."""
+        self._last_sweep = now
+        if self._ttl is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM responses WHERE created_at <= ?", (now - self._ttl,)
+            )
+            self._stats["evictions"] += max(cursor.rowcount, 0)
+        self._total_bytes = self._stored_bytes()
+
+    def _evict(self) -> None:
+        """Drops least recently used entries while over ``max_bytes``."""
+        if self._max_bytes is None or self._total_bytes <= self._max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        )
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= self._max_bytes:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._stats["evictions"] += len(doomed)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
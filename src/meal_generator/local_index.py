@@ -0,0 +1,316 @@
+"""
+Offline Open Food Facts index.
+
+Builds a SQLite FTS5 full-text index from an Open Food Facts JSONL or CSV
+export and provides ``LocalRetriever``, a drop-in ``Retriever`` that serves
+lookups from that index with no network I/O.
+
+Build an index from the command line with::
+
+    python -m meal_generator.local_index products.jsonl.gz off.sqlite \\
+        --country "United Kingdom"
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import re
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from .retriever import Retriever
+
+logger = logging.getLogger(__name__)
+
+# Only the nutriment keys read by ``Retriever`` are kept in the index.
+_NUTRIMENT_KEYS = (
+    "energy-kcal_100g",
+    "fat_100g",
+    "saturated-fat_100g",
+    "carbohydrates_100g",
+    "sugars_100g",
+    "fiber_100g",
+    "proteins_100g",
+    "salt_100g",
+    "serving_quantity",
+    "energy-kcal_serving",
+)
+
+_PRODUCT_URL = "https://world.openfoodfacts.org/product/{code}"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class LocalIndexError(Exception):
+    pass
+
+
+def _normalize_country(country: str) -> str:
+    """Normalises 'en:united-kingdom' / 'United Kingdom' to 'united kingdom'."""
+    country = country.strip().lower()
+    if ":" in country:
+        country = country.split(":", 1)[1]
+    return country.replace("-", " ").replace("_", " ")
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.strip():
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _open_text(path: str) -> TextIO:
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _iter_jsonl(handle: TextIO) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed JSON on line {line_number}.")
+
+
+def _iter_csv(handle: TextIO) -> Iterator[Dict[str, Any]]:
+    """Reads the OFF CSV export, reshaping flat columns into the JSON layout."""
+    csv.field_size_limit(sys.maxsize)
+    header = handle.readline()
+    delimiter = "\t" if "\t" in header else ","
+    fieldnames = next(csv.reader([header], delimiter=delimiter))
+    reader = csv.DictReader(handle, fieldnames=fieldnames, delimiter=delimiter)
+    for row in reader:
+        countries = row.get("countries_tags") or row.get("countries_en") or ""
+        yield {
+            "code": row.get("code"),
+            "product_name": row.get("product_name"),
+            "brands": row.get("brands"),
+            "url": row.get("url"),
+            "countries_tags": [c for c in countries.split(",") if c],
+            "serving_quantity": row.get("serving_quantity"),
+            "nutriments": {key: row.get(key) for key in _NUTRIMENT_KEYS},
+        }
+
+
+def _iter_products(path: str, fmt: Optional[str]) -> Iterator[Dict[str, Any]]:
+    if fmt is None:
+        stripped = path[:-3] if path.endswith(".gz") else path
+        fmt = "csv" if stripped.endswith((".csv", ".tsv")) else "jsonl"
+    handle = _open_text(path)
+    try:
+        if fmt == "csv":
+            yield from _iter_csv(handle)
+        elif fmt == "jsonl":
+            yield from _iter_jsonl(handle)
+        else:
+            raise LocalIndexError(f"Unsupported dump format: '{fmt}'.")
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _project_product(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Reduces a raw OFF product to the fields the retriever reads."""
+    name = raw.get("product_name")
+    if not name:
+        return None
+    raw_nutriments = raw.get("nutriments") or {}
+    nutriments = {}
+    for key in _NUTRIMENT_KEYS:
+        value = _to_float(raw_nutriments.get(key))
+        if value is None and key == "serving_quantity":
+            value = _to_float(raw.get("serving_quantity"))
+        if value is not None:
+            nutriments[key] = value
+    code = raw.get("code")
+    return {
+        "product_name": name,
+        "brands": raw.get("brands") or None,
+        "url": raw.get("url") or (_PRODUCT_URL.format(code=code) if code else None),
+        "nutriments": nutriments,
+    }
+
+
+def _create_schema(connection: sqlite3.Connection) -> None:
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products USING fts5("
+        "product_name, brands, countries, doc UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def build_local_index(
+    dump_path: str,
+    index_path: str,
+    countries: Optional[Sequence[str]] = None,
+    fmt: Optional[str] = None,
+    batch_size: int = 5000,
+) -> int:
+    """
+    Ingests an Open Food Facts dump into a SQLite FTS5 index.
+
+    Args:
+        dump_path: Path to a JSONL or CSV export (optionally gzipped), or '-'
+            to read JSONL from stdin.
+        index_path: Path of the SQLite database to create or append to.
+        countries: If given, only products sold in one of these countries
+            (names or OFF tags, e.g. 'United Kingdom' or 'en:united-kingdom')
+            are indexed.
+        fmt: 'jsonl' or 'csv'. Inferred from the file extension when omitted.
+        batch_size: Number of rows inserted per transaction.
+
+    Returns:
+        The number of products indexed.
+    """
+    wanted = {_normalize_country(c) for c in countries} if countries else None
+    connection = sqlite3.connect(index_path)
+    try:
+        _create_schema(connection)
+        batch: List[tuple] = []
+        indexed = 0
+        for raw in _iter_products(dump_path, fmt):
+            product_countries = {
+                _normalize_country(c) for c in raw.get("countries_tags") or []
+            }
+            if wanted is not None and not (wanted & product_countries):
+                continue
+            product = _project_product(raw)
+            if product is None:
+                continue
+            batch.append(
+                (
+                    product["product_name"],
+                    product["brands"] or "",
+                    " | ".join(sorted(product_countries)),
+                    json.dumps(product, separators=(",", ":")),
+                )
+            )
+            if len(batch) >= batch_size:
+                indexed += _insert_batch(connection, batch)
+        if batch:
+            indexed += _insert_batch(connection, batch)
+        connection.execute("INSERT INTO products(products) VALUES('optimize')")
+        connection.commit()
+    finally:
+        connection.close()
+    logger.info(f"Indexed {indexed} products into '{index_path}'.")
+    return indexed
+
+
+def _insert_batch(connection: sqlite3.Connection, batch: List[tuple]) -> int:
+    with connection:
+        connection.executemany(
+            "INSERT INTO products(product_name, brands, countries, doc) "
+            "VALUES (?, ?, ?, ?)",
+            batch,
+        )
+    count = len(batch)
+    batch.clear()
+    return count
+
+
+def _fts_phrase(text: str) -> Optional[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+class LocalRetriever(Retriever):
+    """
+    A ``Retriever`` backed by a local index built with ``build_local_index``.
+
+    Lookups return the same product documents as the Open Food Facts search
+    API, so the exact-match and contextual-example payloads are unchanged.
+    """
+
+    def __init__(self, index_path: str, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            self._connection = sqlite3.connect(
+                f"file:{index_path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._connection.execute("SELECT 1 FROM products LIMIT 1")
+        except sqlite3.Error as e:
+            raise LocalIndexError(
+                f"Could not open local index '{index_path}': {e}"
+            ) from e
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        self._connection.close()
+
+    def search(
+        self, query: str, country_code: str, count: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Synchronously searches the index, best matches first."""
+        phrase = _fts_phrase(query)
+        if phrase is None:
+            return None
+        match = f"{{product_name brands}}: ({phrase})"
+        country_tokens = _TOKEN_RE.findall(
+            _normalize_country(self._country_name(country_code))
+        )
+        if country_tokens:
+            match += f' AND countries: "{" ".join(country_tokens)}"'
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT doc FROM products WHERE products MATCH ? "
+                "ORDER BY bm25(products, 10.0, 5.0, 0.0) LIMIT ?",
+                (match, count),
+            ).fetchall()
+        return [json.loads(doc) for (doc,) in rows] or None
+
+    async def _fetch_products_async(
+        self, session: None, query: str, country_code: str, count: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        self._lookup_stats["requests"] += 1
+        return await asyncio.to_thread(self.search, query, country_code, count)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build a local Open Food Facts index for LocalRetriever."
+    )
+    parser.add_argument("dump", help="JSONL/CSV dump path (optionally .gz), or '-'.")
+    parser.add_argument("index", help="SQLite index file to create.")
+    parser.add_argument(
+        "--country",
+        action="append",
+        dest="countries",
+        help="Only index products sold in this country. Repeatable.",
+    )
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    logging.basicConfig(level=logging.INFO)
+    count = build_local_index(
+        args.dump, args.index, countries=args.countries, fmt=args.format
+    )
+    print(f"Indexed {count} products.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
+import json
 import uuid
-from typing import List, Dict, Any, TYPE_CHECKING
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
 from .mappable import _PydanticMappable
 from .meal_component import MealComponent
@@ -25,6 +26,7 @@ class Meal(_PydanticMappable):
         description: str,
         meal_type: MealType,
         component_list: List[MealComponent],
+        id: Optional[str] = None,
     ):
         if not name:
             raise ValueError("Meal name cannot be empty.")
@@ -32,7 +34,13 @@ class Meal(_PydanticMappable):
             raise ValueError("Meal description cannot be empty.")
         if not component_list:
             raise ValueError("Meal must contain at least one component.")
-        self.id: uuid.UUID = uuid.uuid4()
+        if id:
+            try:
+                self.id: uuid.UUID = uuid.UUID(id)
+            except ValueError:
+                raise ValueError("Provided ID must be a valid UUID string.")
+        else:
+            self.id: uuid.UUID = uuid.uuid4()
         self.name: str = name
         self.description: str = description
         self.type: MealType = meal_type
@@ -58,6 +66,28 @@ class Meal(_PydanticMappable):
             "components": [component.as_dict() for component in self.component_list],
         }
 
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Meal":
+        """
+        Recreates a Meal from the output of ``as_dict``, preserving the meal and
+        component ids. The aggregate nutrient profile is recalculated from the
+        components.
+        """
+        return cls(
+            name=data["name"],
+            description=data["description"],
+            meal_type=MealType(data["type"]),
+            component_list=[MealComponent.from_dict(c) for c in data["components"]],
+            id=data.get("id"),
+        )
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "Meal":
+        return cls.from_dict(json.loads(json_str))
+
     def add_component(self, component: MealComponent):
         if component.id in self._components:
             raise DuplicateComponentIDError(
@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import Any, Dict, Optional
+import json
 import uuid
 
 from .mappable import _PydanticMappable
@@ -52,6 +53,31 @@ class MealComponent(_PydanticMappable):
             "nutrient_profile": self.nutrient_profile.as_dict(),
         }
 
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MealComponent":
+        """
+        Recreates a MealComponent from the output of ``as_dict``, preserving its
+        id. A new id is assigned when the dict has none.
+        """
+        return cls(
+            name=data["name"],
+            brand=data.get("brand"),
+            quantity=data["quantity"],
+            metric=data.get("metric"),
+            total_weight=data["total_weight"],
+            component_type=ComponentType(data["type"]),
+            nutrient_profile=NutrientProfile.from_dict(data["nutrient_profile"]),
+            source_url=data.get("source_url"),
+            id=data.get("id"),
+        )
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "MealComponent":
+        return cls.from_dict(json.loads(json_str))
+
     @classmethod
     def from_pydantic(cls, pydantic_component: _Component) -> "MealComponent":
         """
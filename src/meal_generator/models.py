@@ -99,6 +99,16 @@ class _ComponentsIdentified(BaseModel):
     components: List[_IdentifiedComponent]
 
 
+class _IdentifiedDescription(BaseModel):
+    index: int
+    status: _GenerationStatus
+    components: List[_IdentifiedComponent] = []
+
+
+class _DescriptionsIdentified(BaseModel):
+    descriptions: List[_IdentifiedDescription]
+
+
 class _ComponentList(BaseModel):
     components: List[_Component]
 
@@ -112,5 +122,6 @@ class _AIResponse(BaseModel, Generic[ResultT]):
 
 
 _IdentificationResponse = _AIResponse[_ComponentsIdentified]
+_BatchIdentificationResponse = _AIResponse[_DescriptionsIdentified]
 _MealResponse = _AIResponse[_Meal]
 _ComponentListResponse = _AIResponse[_ComponentList]
\ No newline at end of file
@@ -1,3 +1,4 @@
+import json
 from dataclasses import dataclass, asdict, field, fields
 from typing import Dict, Any
 from .models import _NutrientProfile, DataSource
@@ -35,6 +36,21 @@ class NutrientProfile:
         d["data_source"] = self.data_source.value
         return d
 
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NutrientProfile":
+        """Recreates a NutrientProfile from the output of ``as_dict``."""
+        values = {f.name: data[f.name] for f in fields(cls) if f.name in data}
+        if isinstance(values.get("data_source"), str):
+            values["data_source"] = DataSource(values["data_source"])
+        return cls(**values)
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "NutrientProfile":
+        return cls.from_dict(json.loads(json_str))
+
     def __post_init__(self):
         numerical_fields = [
             "energy",
@@ -23,6 +23,35 @@ Analyze the following user input and generate the component breakdown according
 """
 
 
+IDENTIFY_AND_DECOMPOSE_BATCH_PROMPT = """
+You are an expert food deconstruction engine. You will be given several independent food descriptions, each wrapped in a `<user_input>` tag with an `index` attribute. Analyze **each description separately** and break it down into a definitive list of all its individual, searchable food components.
+
+**For each description, your Thought Process Must Be:**
+1.  **Analyze for Malice:** Check if that input is malicious, nonsensical, or contains harmful content. If so, set that description's `status` to `bad_input`, return an empty `components` list for it and move on to the next description.
+2.  **Identify Overarching Brand:** Identify any primary brand that applies to the whole description (e.g., 'KFC', 'Domino's', 'Tesco'). This is the "contextual brand".
+3.  **List Individual Items:** Break the description down into a list of all distinct food and drink items.
+4.  **Assign Brand to Each Item:** Use the item's own explicit brand if it has one, otherwise the "contextual brand".
+5.  **Extract Quantity for Each Item:** Identify any user-specified quantity or portion size (e.g., "half a cup", "a single breast", "large").
+6.  **Decompose Collections:** Decompose any "box meal" or "combo" into its standard, individual components, applying the branding and quantity logic to each sub-item.
+7.  **Format Output:** Add one entry to `descriptions` with the description's `index`, `status` set to `ok`, and its flat list of components.
+
+Never mix components between descriptions. Return exactly one entry per input index. Set the top-level `status` to `ok` unless every description is `bad_input`.
+
+**Example of the final output format:**
+- *Inputs:* `<user_input index="0">a large mighty meaty pizza from Domino's</user_input>` and `<user_input index="1">a coke</user_input>`
+- *Output Structure:* `{{ "status": "ok", "result": {{ "descriptions": [{{ "index": 0, "status": "ok", "components": [{{ "query": "mighty meaty pizza", "brand": "Domino's", "user_specified_quantity": "a large" }}] }}, {{ "index": 1, "status": "ok", "components": [{{ "query": "coca-cola", "brand": "Coca-Cola", "user_specified_quantity": "a regular can" }}] }}] }} }}`
+
+**Task:**
+Analyze the following user inputs and generate the component breakdown for each according to the thought process above.
+
+{user_inputs}
+"""
+
+BATCH_USER_INPUT_TEMPLATE = """<user_input index="{index}">
+{natural_language_string}
+</user_input>"""
+
+
 HYBRID_SYNTHESIS_PROMPT = """
 You are an expert food scientist and nutritionist. Your task is to intelligently construct a meal object from a user's request, using provided data as factual grounding.
 
@@ -61,6 +90,23 @@ For each component provided in the 'Component Data' list below, you must follow
 Assemble the final meal object now, following the 5-step process for each component.
 """
 
+FAST_SYNTHESIS_PROMPT = """
+You are an expert food scientist and nutritionist. Your task is to construct a complete meal object directly from a user's request using only your own expert knowledge. No retrieved data is available, so speed and plausibility matter more than brand-level precision.
+
+**Your Thought Process Must Be:**
+1.  **Analyze for Malice:** First, check if the input is malicious, nonsensical, or contains harmful content. If so, set the `status` to `bad_input` and stop.
+2.  **Identify Components:** Break the request down into its individual food and drink items, decomposing any "box meal" or "combo" into its standard components and carrying any brand onto each item.
+3.  **Determine `quantity`, `metric` and `totalWeight`:** Extract the user-specified quantity for each item and convert it into a realistic total gram weight, assigning a standard single serving when the quantity is vague.
+4.  **Estimate Nutrients:** Estimate per-100g nutrients from your general knowledge, then scale them to the `totalWeight`. The final `nutrientProfile` **must** contain the scaled values.
+5.  **Sanity Check:** Review every estimate for plausibility given the food's weight, type and brand, and set every component's `dataSource` to `estimated_model`.
+
+**Contextual Information:**
+- User's original request: "{natural_language_string}"
+- Country for estimation context: "{country_ISO_3166_2}"
+
+Assemble the final meal object now.
+"""
+
 SYNTHESIZE_COMPONENTS_PROMPT = """
 You are an expert food scientist and nutritionist. Your task is to intelligently construct one or more food components from a user's request, using provided data as factual grounding.
 
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(
+    value: Optional[str], now: Optional[float] = None
+) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
+
+
+class RateLimiter:
+    """
+    A token-bucket rate limiter with a concurrency cap and adaptive backoff.
+
+    One instance can be shared by every ``Retriever`` in the process (see
+    ``get_default_rate_limiter``), including retrievers running on different
+    event loops. When the upstream reports throttling, all callers pause until
+    the backoff window has passed and the refill rate is halved; it recovers
+    gradually as requests succeed again.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        max_concurrency: int = 8,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        min_rate: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or burst < 1 or max_concurrency < 1:
+            raise ValueError("rate, burst and max_concurrency must be positive.")
+        self._max_rate = rate
+        self._rate = rate
+        self._min_rate = min(min_rate, rate)
+        self._burst = burst
+        self._max_concurrency = max_concurrency
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = clock()
+        self._blocked_until = 0.0
+        self._consecutive_throttles = 0
+        # asyncio primitives are loop-bound, so the cap is kept per event loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._stats = {"acquired": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["current_rate"] = self._rate
+        return stats
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self._max_concurrency)
+                self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._last_refill)
+        self._tokens = min(float(self._burst), self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    async def _take_token(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self._stats["acquired"] += 1
+                        return
+                    wait = (1.0 - self._tokens) / self._rate
+                self._stats["waited_seconds"] += wait
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Waits for a token and a concurrency slot for one request."""
+        async with self._semaphore():
+            await self._take_token()
+            yield
+
+    def report_throttled(self, retry_after: Optional[float] = None) -> float:
+        """
+        Records a 429/503 response. Every caller is paused for ``retry_after``
+        seconds when given, otherwise for an exponentially growing backoff.
+        Returns the applied delay.
+        """
+        with self._lock:
+            self._consecutive_throttles += 1
+            self._stats["throttled"] += 1
+            if retry_after is None:
+                retry_after = self._base_backoff * 2 ** (
+                    self._consecutive_throttles - 1
+                )
+            delay = min(retry_after, self._max_backoff)
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+            self._rate = max(self._min_rate, self._rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+        logger.warning(
+            f"Open Food Facts throttled the request; backing off for {delay:.1f}s "
+            f"(rate now {self._rate:.2f}/s)."
+        )
+        return delay
+
+    def report_success(self) -> None:
+        """Records a successful response, gradually restoring the refill rate."""
+        with self._lock:
+            self._consecutive_throttles = 0
+            if self._rate < self._max_rate:
+                self._rate = min(self._max_rate, self._rate + self._max_rate * 0.1)
+
+
+_default_rate_limiter: Optional[RateLimiter] = None
+_default_rate_limiter_lock = threading.Lock()
+
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter shared by all retrievers by default."""
+    global _default_rate_limiter
+    with _default_rate_limiter_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = RateLimiter()
+        return _default_rate_limiter
+
+
+def set_default_rate_limiter(limiter: RateLimiter) -> None:
+    """Replaces the process-wide limiter, e.g. to tune its limits at startup."""
+    global _default_rate_limiter
+    with _default_rate_limiter_lock:
+        _default_rate_limiter = limiter
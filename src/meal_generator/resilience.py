@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+import httpx
+from google.genai import errors as genai_errors
+
+from .rate_limit import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that indicate a transient provider problem worth retrying.
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Whether a failed model call may succeed if simply tried again.
+
+    Besides retryable API statuses this covers transport failures, which the
+    genai async client raises as ``aiohttp``/``httpx`` errors rather than
+    ``ConnectionError``.
+    """
+    if isinstance(error, genai_errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUS_CODES
+    return isinstance(
+        error,
+        (asyncio.TimeoutError, OSError, aiohttp.ClientError, httpx.TransportError),
+    )
+
+
+def is_client_error(error: BaseException) -> bool:
+    """Whether the provider answered and rejected the request itself (4xx)."""
+    return (
+        isinstance(error, genai_errors.APIError)
+        and error.code is not None
+        and 400 <= error.code < 500
+        and error.code not in RETRYABLE_STATUS_CODES
+    )
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """Whether a model call failed because the API key ran out of quota."""
+    return isinstance(error, genai_errors.APIError) and error.code == 429
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Returns the Retry-After delay carried by an API error's response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    return parse_retry_after(headers.get("Retry-After"))
+
+
+class RetryPolicy:
+    """
+    Retries with jittered exponential backoff.
+
+    The delay before retry ``attempt`` (0-based) is drawn uniformly from
+    ``[0, min(max_delay, base_delay * 2**attempt)]`` ("full jitter"), so
+    callers that failed together do not retry in lockstep. A Retry-After hint
+    from the provider is used as a lower bound.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        rng: Callable[[float, float], float] = random.uniform,
+    ):
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative.")
+        self.max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._rng = rng
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        ceiling = min(self._max_delay, self._base_delay * 2**attempt)
+        delay = self._rng(0.0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self._max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fails model calls fast while the provider is down.
+
+    The breaker opens after ``failure_threshold`` consecutive retryable
+    failures and rejects calls for ``reset_timeout`` seconds. It then lets a
+    single probe call through (half-open): success closes it again, failure
+    re-opens it. By default every generator in the process shares one
+    instance per model (see ``get_default_circuit_breaker``); it is safe to
+    use from several threads and event loops.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self._stats = {"opened": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["state"] = self._current_state(self._clock())
+            stats["consecutive_failures"] = self._consecutive_failures
+        return stats
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self._reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; counts a rejection when it may not."""
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and (
+                self._probe_started_at is None
+                # A probe that never reported back (e.g. it was cancelled)
+                # must not keep the breaker half-open forever.
+                or now - self._probe_started_at >= self._reset_timeout
+            ):
+                self._state = self.HALF_OPEN
+                self._probe_started_at = now
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._consecutive_failures = 0
+            self._state = self.CLOSED
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED
+                and self._consecutive_failures >= self._failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_started_at = None
+                self._stats["opened"] += 1
+                logger.warning(
+                    f"AI model circuit breaker opened after "
+                    f"{self._consecutive_failures} consecutive failures."
+                )
+
+
+_default_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_default_circuit_breaker_lock = threading.Lock()
+
+
+def get_default_circuit_breaker(model: str) -> CircuitBreaker:
+    """
+    Returns the process-wide breaker for ``model``, shared by all generators
+    by default. Each model has its own, so an outage of one model does not
+    fail calls to another (e.g. the fallback model) fast.
+    """
+    with _default_circuit_breaker_lock:
+        breaker = _default_circuit_breakers.get(model)
+        if breaker is None:
+            breaker = _default_circuit_breakers[model] = CircuitBreaker()
+        return breaker
+
+
+def set_default_circuit_breaker(model: str, breaker: CircuitBreaker) -> None:
+    """Replaces a model's process-wide breaker, e.g. to tune its thresholds."""
+    with _default_circuit_breaker_lock:
+        _default_circuit_breakers[model] = breaker
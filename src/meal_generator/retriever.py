@@ -1,21 +1,418 @@
 # in retriever.py
 
 import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import deque
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from .cache import TTLCache
+from .canonical import QueryCanonicalizer
+from .rate_limit import RateLimiter, get_default_rate_limiter, parse_retry_after
+from .transport import AiohttpTransport, CassetteMissError
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional speed-up
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+_THROTTLE_STATUSES = (429, 503)
+
+# Only these product fields are read, so the API is asked to omit the rest
+# (ingredients, images, tags, ...), which make up most of each document.
+_PRODUCT_FIELDS = "product_name,brands,url,nutriments"
+
+
+# ISO 3166-1 alpha-2 codes mapped to the English country names Open Food Facts
+# uses for its country tags (e.g. 'FR' -> 'France' -> 'en:france').
+_COUNTRY_NAMES = {
+    "AR": "Argentina",
+    "AT": "Austria",
+    "AU": "Australia",
+    "BE": "Belgium",
+    "BG": "Bulgaria",
+    "BR": "Brazil",
+    "CA": "Canada",
+    "CH": "Switzerland",
+    "CL": "Chile",
+    "CN": "China",
+    "CO": "Colombia",
+    "CZ": "Czech Republic",
+    "DE": "Germany",
+    "DK": "Denmark",
+    "EG": "Egypt",
+    "ES": "Spain",
+    "FI": "Finland",
+    "FR": "France",
+    "GB": "United Kingdom",
+    "GR": "Greece",
+    "HR": "Croatia",
+    "HU": "Hungary",
+    "IE": "Ireland",
+    "IL": "Israel",
+    "IN": "India",
+    "IT": "Italy",
+    "JP": "Japan",
+    "KR": "South Korea",
+    "LU": "Luxembourg",
+    "MA": "Morocco",
+    "MX": "Mexico",
+    "NL": "Netherlands",
+    "NO": "Norway",
+    "NZ": "New Zealand",
+    "PE": "Peru",
+    "PH": "Philippines",
+    "PL": "Poland",
+    "PT": "Portugal",
+    "RO": "Romania",
+    "RS": "Serbia",
+    "RU": "Russia",
+    "SA": "Saudi Arabia",
+    "SE": "Sweden",
+    "SG": "Singapore",
+    "SI": "Slovenia",
+    "SK": "Slovakia",
+    "TH": "Thailand",
+    "TN": "Tunisia",
+    "TR": "Turkey",
+    "UA": "Ukraine",
+    "US": "United States",
+    "ZA": "South Africa",
+}
+
+
+class RetrievalThrottledError(Exception):
+    """Raised when Open Food Facts keeps throttling a lookup after backing off."""
+
+    pass
+
+
+class RetrievalTimeoutError(Exception):
+    """Raised when an Open Food Facts request exceeds its deadline."""
+
+    pass
+
+
+class _InFlightLookup:
+    """A shared search request and the number of lookups awaiting it."""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
 
 
 class Retriever:
-    """Handles fetching and formatting data from the Open Food Facts API asynchronously."""
+    """
+    Handles fetching and formatting data from the Open Food Facts API asynchronously.
+
+    A keep-alive ``aiohttp.ClientSession`` is created lazily for each event
+    loop on first use and reused for every subsequent lookup on that loop, so
+    repeated meal generations share pooled TCP/TLS connections. Call
+    ``aclose()`` (or use ``async with``) to release the pools.
+
+    Search results are memoised in a TTL/LRU cache keyed on the normalised
+    search terms, country and page size, and concurrent identical searches
+    are coalesced into a single in-flight request.
+
+    All requests pass through a ``RateLimiter`` (the process-wide default
+    unless one is given) which caps request rate and concurrency and backs
+    off when the API responds with 429/503.
+
+    With ``speculative=True``, branded components launch the brand-exact and
+    contextual searches concurrently; the contextual request is cancelled
+    when the exact match wins.
+
+    Every request has its own ``request_timeout`` deadline, and each
+    component's whole lookup (including waits for the rate limiter and
+    throttle retries) is bounded by ``lookup_timeout``; a component whose
+    lookup times out degrades to ``estimated_model`` instead of stalling the
+    meal. With ``hedge_percentile`` set, a duplicate request is sent once the
+    first has been outstanding longer than that percentile of recent request
+    latencies, and whichever answers first is used.
+
+    Searches request only the product fields the retriever reads and are
+    decoded with ``orjson`` when it is installed; bytes received and parse
+    time are tallied in ``cache_stats``.
+
+    Queries are canonicalised with a ``QueryCanonicalizer`` before caching,
+    and components of one request that canonicalise to the same query and
+    brand are looked up once and fanned back out.
+
+    Requests are sent through ``transport`` (by default the pooled aiohttp
+    session); a ``RecordingTransport`` or ``ReplayTransport`` records
+    searches to, or serves them from, a cassette file.
+    """
+
+    _API_URL = "https://world.openfoodfacts.org/cgi/search.pl"
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        pool_limit: int = 100,
+        pool_limit_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 20.0,
+        cache: Optional[TTLCache] = None,
+        use_cache: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_throttle_retries: int = 2,
+        speculative: bool = False,
+        request_timeout: Optional[float] = 5.0,
+        lookup_timeout: Optional[float] = 15.0,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        canonicalizer: Optional[QueryCanonicalizer] = None,
+        transport: Optional[Any] = None,
+    ):
+        if hedge_percentile is not None and not 0 < hedge_percentile < 1:
+            raise ValueError("hedge_percentile must be between 0 and 1.")
+        self._api_url = api_url or self._API_URL
+        self._pool_limit = pool_limit
+        self._pool_limit_per_host = pool_limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout
+        # Sessions and in-flight futures are loop-bound, so each event loop
+        # using the retriever (e.g. the background loop behind the sync API
+        # and the caller's own loop) gets its own.
+        self._loop_state_lock = threading.Lock()
+        self._sessions = weakref.WeakKeyDictionary()
+        self._inflight = weakref.WeakKeyDictionary()
+        self._closing_tasks: set = set()
+        self._connection_stats = {"created": 0, "reused": 0}
+        if use_cache:
+            self._cache: Optional[TTLCache] = cache or TTLCache(
+                maxsize=2048, ttl=3600.0
+            )
+        else:
+            self._cache = None
+        self._lookup_stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "throttled": 0,
+            "timeouts": 0,
+            "hedged": 0,
+            "bytes_received": 0,
+            "parse_seconds": 0.0,
+            "deduplicated": 0,
+        }
+        self._rate_limiter = rate_limiter or get_default_rate_limiter()
+        self._max_throttle_retries = max_throttle_retries
+        self._speculative = speculative
+        self._speculation_stats = {
+            "exact_wins": 0,
+            "contextual_wins": 0,
+            "contextual_cancelled": 0,
+        }
+        self._request_timeout = request_timeout
+        self._lookup_timeout = lookup_timeout
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._latencies: deque = deque(maxlen=500)
+        self._canonicalizer = canonicalizer or QueryCanonicalizer()
+        self._transport = transport or AiohttpTransport()
+
+    @property
+    def connection_stats(self) -> Dict[str, int]:
+        """Counts of new vs. reused pooled connections since construction."""
+        return dict(self._connection_stats)
+
+    @property
+    def speculation_stats(self) -> Dict[str, int]:
+        """How often the exact (Layer 1) or contextual (Layer 2) path won."""
+        return dict(self._speculation_stats)
+
+    @property
+    def cache_stats(self) -> Dict[str, Any]:
+        """Search cache hit/miss/eviction counts plus single-flight coalescing."""
+        stats = self._cache.stats.as_dict() if self._cache is not None else {}
+        stats["size"] = len(self._cache) if self._cache is not None else 0
+        stats.update(self._lookup_stats)
+        return stats
+
+    @property
+    def latency_stats(self) -> Dict[str, Optional[float]]:
+        """Percentiles (seconds) of recent successful request latencies."""
+        return {
+            "samples": len(self._latencies),
+            "p50": self._latency_percentile(0.5),
+            "p95": self._latency_percentile(0.95),
+            "p99": self._latency_percentile(0.99),
+            "hedge_delay": self._hedge_delay(),
+        }
+
+    def _latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(percentile * (len(ordered) - 1))]
+
+    def _hedge_delay(self) -> Optional[float]:
+        if (
+            self._hedge_percentile is None
+            or len(self._latencies) < self._hedge_min_samples
+        ):
+            return None
+        return self._latency_percentile(self._hedge_percentile)
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_create(session, context, params):
+            self._connection_stats["created"] += 1
+
+        async def on_reuse(session, context, params):
+            self._connection_stats["reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_create)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
+    def _get_session(self) -> Optional[aiohttp.ClientSession]:
+        """Returns the running loop's session, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        with self._loop_state_lock:
+            session = self._sessions.get(loop)
+            if session is not None and not session.closed:
+                return session
+            stale = [(l, s) for l, s in self._sessions.items() if l.is_closed()]
+            for stale_loop, _ in stale:
+                del self._sessions[stale_loop]
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_limit,
+                limit_per_host=self._pool_limit_per_host,
+                ttl_dns_cache=self._dns_cache_ttl,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+                trace_configs=[self._create_trace_config()],
+            )
+            self._sessions[loop] = session
+        for _, stale_session in stale:
+            # The finished loop's transports are gone, so closing only marks
+            # the session and connector closed; it is safe on this loop.
+            task = asyncio.ensure_future(stale_session.close())
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+        return session
+
+    def _inflight_lookups(self) -> Dict[Tuple[str, str, int], "_InFlightLookup"]:
+        """Returns the running loop's in-flight searches (futures are loop-bound)."""
+        loop = asyncio.get_running_loop()
+        with self._loop_state_lock:
+            inflight = self._inflight.get(loop)
+            if inflight is None:
+                inflight = self._inflight[loop] = {}
+        return inflight
+
+    async def aclose(self) -> None:
+        """
+        Closes the pooled sessions of every event loop. The retriever can be
+        reused afterwards.
+        """
+        loop = asyncio.get_running_loop()
+        with self._loop_state_lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+        for session_loop, session in sessions:
+            if session.closed:
+                continue
+            if session_loop is loop or session_loop.is_closed():
+                await session.close()
+            elif session_loop.is_running():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+                )
+            else:
+                logger.warning(
+                    "Retriever session is bound to an idle event loop and "
+                    "cannot be closed from here."
+                )
 
-    def __init__(self):
-        self._api_url = "https://world.openfoodfacts.org/cgi/search.pl"
+    async def __aenter__(self) -> "Retriever":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
 
     async def _get_products_async(
         self, session: aiohttp.ClientSession, query: str, country_code: str, count: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns products for a query, served from the cache when possible.
+        Identical concurrent lookups share one in-flight request.
+        """
+        key = (self._canonicalizer.canonicalize(query), country_code, count)
+        if self._cache is not None:
+            cached = self._cache.get(key, None)
+            if cached is not None:
+                return cached[0]
+
+        lookups = self._inflight_lookups()
+        inflight = lookups.get(key)
+        if inflight is None:
+            future = asyncio.ensure_future(
+                self._fetch_products_async(session, query, country_code, count)
+            )
+            inflight = _InFlightLookup(future)
+            lookups[key] = inflight
+            future.add_done_callback(
+                lambda f: self._on_fetch_done(lookups, key, inflight, f)
+            )
+        else:
+            self._lookup_stats["coalesced"] += 1
+
+        inflight.waiters += 1
+        try:
+            return await asyncio.shield(inflight.future)
+        except aiohttp.ClientError:
+            # In production, you might want more specific error handling or logging here.
+            return None
+        finally:
+            inflight.waiters -= 1
+            # Abort the shared request once nobody is waiting for it any more,
+            # unregistering it first so a new lookup starts a fresh request
+            # instead of awaiting the cancelled one.
+            if inflight.waiters == 0 and not inflight.future.done():
+                if lookups.get(key) is inflight:
+                    del lookups[key]
+                inflight.future.cancel()
+
+    def _on_fetch_done(
+        self,
+        lookups: Dict[Tuple[str, str, int], "_InFlightLookup"],
+        key: Tuple[str, str, int],
+        inflight: "_InFlightLookup",
+        future: asyncio.Future,
+    ) -> None:
+        if lookups.get(key) is inflight:
+            del lookups[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        if self._cache is not None:
+            # Wrapped so that a cached "no products" result is distinguishable
+            # from a cache miss.
+            self._cache.set(key, (future.result(),))
+
+    async def _fetch_products_async(
+        self, session: aiohttp.ClientSession, query: str, country_code: str, count: int
     ) -> Optional[List[Dict[str, Any]]]:
         """Async internal method to call the API with a descriptive query."""
-        country_name = "United Kingdom" if country_code == "GB" else country_code
+        self._lookup_stats["requests"] += 1
+        country_name = self._country_name(country_code)
         params = {
             "search_terms": query.strip(),
             "search_simple": 1,
@@ -25,16 +422,95 @@ class Retriever:
             "tagtype_0": "countries",
             "tag_contains_0": "contains",
             "tag_0": country_name,
+            "fields": _PRODUCT_FIELDS,
         }
 
+        for _ in range(self._max_throttle_retries + 1):
+            try:
+                status, retry_after, data = await self._hedged_request(
+                    session, params
+                )
+            except RetrievalTimeoutError:
+                self._lookup_stats["timeouts"] += 1
+                raise RetrievalTimeoutError(
+                    f"Open Food Facts search for '{query.strip()}' timed out."
+                ) from None
+            if status in _THROTTLE_STATUSES:
+                self._rate_limiter.report_throttled(parse_retry_after(retry_after))
+                continue
+            self._rate_limiter.report_success()
+            return data.get("products") if data.get("count", 0) > 0 else None
+        raise RetrievalThrottledError(
+            f"Open Food Facts throttled the search for '{query.strip()}'."
+        )
+
+    async def _request_once(
+        self, session: aiohttp.ClientSession, params: Dict[str, Any]
+    ) -> Tuple[int, Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Sends one search request. Returns the status, the Retry-After header
+        for throttled responses, and the decoded body otherwise.
+
+        The ``request_timeout`` deadline starts once a rate-limiter slot is
+        held, so time spent queueing or backing off is not counted as upstream
+        slowness.
+        """
+        async with self._rate_limiter.slot():
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self._transport.get(session, self._api_url, params),
+                    self._request_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise RetrievalTimeoutError() from None
+        if response.status in _THROTTLE_STATUSES:
+            return response.status, response.headers.get("Retry-After"), None
+        response.raise_for_status()
+        body = response.body
+        self._latencies.append(time.monotonic() - started)
+        parse_started = time.perf_counter()
+        data = _json_loads(body)
+        self._lookup_stats["parse_seconds"] += time.perf_counter() - parse_started
+        self._lookup_stats["bytes_received"] += len(body)
+        return response.status, None, data
+
+    async def _hedged_request(
+        self, session: aiohttp.ClientSession, params: Dict[str, Any]
+    ) -> Tuple[int, Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Sends a request, plus a hedged duplicate if the first is slower than the
+        configured latency percentile. Returns the first successful answer.
+        """
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return await self._request_once(session, params)
+
+        pending = {asyncio.ensure_future(self._request_once(session, params))}
         try:
-            async with session.get(self._api_url, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data.get("products") if data.get("count", 0) > 0 else None
-        except aiohttp.ClientError:
-            # In production, you might want more specific error handling or logging here.
-            return None
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                self._lookup_stats["hedged"] += 1
+                pending.add(asyncio.ensure_future(self._request_once(session, params)))
+            error: Optional[BaseException] = None
+            while done or pending:
+                if not done:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                task = done.pop()
+                if task.exception() is None:
+                    return task.result()
+                error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _country_name(country_code: str) -> str:
+        """Maps an ISO country code to the Open Food Facts country name."""
+        return _COUNTRY_NAMES.get(country_code.strip().upper(), country_code)
 
     def _format_100g_payload(self, product: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Formats a product to provide only the raw per-100g data and source URL."""
@@ -79,38 +555,79 @@ class Retriever:
     ) -> Dict[str, Any]:
         """
         Processes one component through the full retrieval logic (exact then contextual).
+        Lookups abandoned because of throttling or a timeout are reported with a
+        ``throttled``/``timeout`` retrieval status rather than as a genuine miss.
+        The whole lookup, including rate-limiter waits and throttle retries, is
+        bounded by ``lookup_timeout``.
         """
-        query = component.query
-        brand = component.brand
         placeholder = {
-            "user_query": query,
-            "user_brand": brand,
+            "user_query": component.query,
+            "user_brand": component.brand,
             "user_specified_quantity": component.user_specified_quantity,
         }
-
-        # Layer 1: Attempt exact match (if brand exists)
-        if brand:
-            search_query = f"{brand} {query}"
-            products = await self._get_products_async(
-                session, search_query, country_code, count=3
+        try:
+            return await asyncio.wait_for(
+                self._lookup_component(
+                    session, component, country_code, dict(placeholder)
+                ),
+                self._lookup_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Lookup for '{component.query}' exceeded its "
+                f"{self._lookup_timeout}s budget; falling back to model estimation."
+            )
+            self._lookup_stats["timeouts"] += 1
+            placeholder["data_source"] = "estimated_model"
+            placeholder["retrieval_status"] = "timeout"
+            return placeholder
+        except RetrievalThrottledError:
+            logger.warning(
+                f"Lookup for '{component.query}' was throttled; "
+                "falling back to model estimation."
+            )
+            self._lookup_stats["throttled"] += 1
+            placeholder["data_source"] = "estimated_model"
+            placeholder["retrieval_status"] = "throttled"
+            return placeholder
+        except RetrievalTimeoutError:
+            logger.warning(
+                f"Lookup for '{component.query}' timed out; "
+                "falling back to model estimation."
             )
-            if products:
-                normalized_query_brand = brand.strip().lower()
-                for product in products:
-                    result_brand_str = product.get("brands")
-                    if (
-                        result_brand_str
-                        and normalized_query_brand in result_brand_str.strip().lower()
-                    ):
-                        formatted_payload = self._format_100g_payload(product)
-                        if formatted_payload:
-                            placeholder.update(formatted_payload)
-                            return placeholder
+            placeholder["data_source"] = "estimated_model"
+            placeholder["retrieval_status"] = "timeout"
+            return placeholder
 
-        # Layer 2: No exact match, find contextual examples
-        context_products = await self._get_products_async(
-            session, query, country_code, count=3
+    async def _find_exact_match(
+        self,
+        session: aiohttp.ClientSession,
+        query: str,
+        brand: str,
+        country_code: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Layer 1: returns the first product whose brand matches the user's brand."""
+        search_query = f"{brand} {query}"
+        products = await self._get_products_async(
+            session, search_query, country_code, count=3
         )
+        if products:
+            normalized_query_brand = brand.strip().lower()
+            for product in products:
+                result_brand_str = product.get("brands")
+                if (
+                    result_brand_str
+                    and normalized_query_brand in result_brand_str.strip().lower()
+                ):
+                    formatted_payload = self._format_100g_payload(product)
+                    if formatted_payload:
+                        return formatted_payload
+        return None
+
+    def _build_contextual_examples(
+        self, context_products: Optional[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Layer 2: summarises similar products as per-serving examples."""
         contextual_examples = []
         if context_products:
             for product in context_products:
@@ -126,29 +643,120 @@ class Retriever:
                 }
                 if payload["name"] and payload["energy_kcal"]:
                     contextual_examples.append(payload)
+        return contextual_examples
+
+    def _record_speculation_win(self, winner: str, contextual_task: asyncio.Future):
+        self._speculation_stats[f"{winner}_wins"] += 1
+        if winner == "exact" and not contextual_task.done():
+            contextual_task.cancel()
+            self._speculation_stats["contextual_cancelled"] += 1
+
+    async def _lookup_component(
+        self,
+        session: aiohttp.ClientSession,
+        component: Dict[str, Any],
+        country_code: str,
+        placeholder: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        query = component.query
+        brand = component.brand
+
+        contextual_task = None
+        if brand and self._speculative:
+            # Speculatively start Layer 2 so a Layer 1 miss costs no extra round trip.
+            contextual_task = asyncio.ensure_future(
+                self._get_products_async(session, query, country_code, count=3)
+            )
+
+        # Layer 1: Attempt exact match (if brand exists)
+        if brand:
+            try:
+                exact_payload = await self._find_exact_match(
+                    session, query, brand, country_code
+                )
+            except BaseException:
+                if contextual_task is not None:
+                    contextual_task.cancel()
+                raise
+            if exact_payload:
+                if contextual_task is not None:
+                    self._record_speculation_win("exact", contextual_task)
+                placeholder.update(exact_payload)
+                placeholder["retrieval_status"] = "matched"
+                return placeholder
+
+        # Layer 2: No exact match, find contextual examples
+        if contextual_task is not None:
+            self._record_speculation_win("contextual", contextual_task)
+            context_products = await contextual_task
+        else:
+            context_products = await self._get_products_async(
+                session, query, country_code, count=3
+            )
+        contextual_examples = self._build_contextual_examples(context_products)
 
         if contextual_examples:
             placeholder["data_source"] = "estimated_with_context"
             placeholder["contextual_examples"] = contextual_examples
+            placeholder["retrieval_status"] = "contextual"
         else:
             placeholder["data_source"] = "estimated_model"
+            placeholder["retrieval_status"] = "miss"
 
         return placeholder
 
+    async def process_component_async(
+        self, component: Any, country_code: str
+    ) -> Dict[str, Any]:
+        """Processes a single identified component, e.g. as it is streamed in."""
+        return await self._process_single_component(
+            self._get_session(), component, country_code
+        )
+
     async def process_components_concurrently(
         self, components: List[Dict[str, Any]], country_code: str
     ) -> List[Dict[str, Any]]:
         """
         Top-level method to process all identified components concurrently.
+        Equivalent components are looked up once and the result is copied to
+        each of them.
         """
-        # Production-ready safety: Use a timeout for the entire session.
-        timeout = aiohttp.ClientTimeout(total=20)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            tasks = [
-                self._process_single_component(session, component, country_code)
-                for component in components
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        session = self._get_session()
+        groups: Dict[Tuple[str, str], List[Any]] = {}
+        for component in components:
+            key = (
+                self._canonicalizer.canonicalize(component.query),
+                self._canonicalizer.canonicalize(component.brand),
+            )
+            groups.setdefault(key, []).append(component)
+        self._lookup_stats["deduplicated"] += len(components) - len(groups)
+
+        group_list = list(groups.values())
+        tasks = [
+            self._process_single_component(session, group[0], country_code)
+            for group in group_list
+        ]
+        group_results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in group_results:
+            # A replay miss means the cassette is stale; dropping the component
+            # would silently change the meal, so the run fails instead.
+            if isinstance(result, CassetteMissError):
+                raise result
+
+        results_by_component = {}
+        for group, result in zip(group_list, group_results):
+            for component in group:
+                if isinstance(result, BaseException):
+                    results_by_component[id(component)] = result
+                    continue
+                fanned_out = copy.deepcopy(result)
+                fanned_out["user_query"] = component.query
+                fanned_out["user_brand"] = component.brand
+                fanned_out["user_specified_quantity"] = (
+                    component.user_specified_quantity
+                )
+                results_by_component[id(component)] = fanned_out
+        results = [results_by_component[id(c)] for c in components]
 
         # Filter out potential exceptions from failed requests, though aiohttp handles most.
-        return [res for res in results if not isinstance(res, Exception)]
+        return [res for res in results if not isinstance(res, BaseException)]
@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from aiohttp import web
+
+from .batch import IdentificationBatcher
+from .generator import CircuitOpenError, MealGenerationError, MealGenerator
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class MealService:
+    """
+    Runs generation requests through a bounded admission queue.
+
+    At most ``workers`` requests are processed at once and at most
+    ``queue_size`` more wait in the queue; ``submit`` raises
+    ``asyncio.QueueFull`` beyond that so the server can shed load instead of
+    queueing without bound. Identification calls that arrive within
+    ``batch_window`` seconds of each other are packed into one LLM call; a
+    window of ``0`` disables micro-batching.
+    """
+
+    def __init__(
+        self,
+        generator: MealGenerator,
+        workers: int = 8,
+        queue_size: int = 64,
+        batch_window: float = 0.02,
+        max_batch_size: int = 16,
+    ):
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers and queue_size must be at least 1.")
+        self._generator = generator
+        self._workers = workers
+        self._queue: "asyncio.Queue[Tuple[Job, asyncio.Future]]" = asyncio.Queue(
+            queue_size
+        )
+        self._worker_tasks: list = []
+        self._busy = 0
+        self._batcher: Optional[IdentificationBatcher] = None
+        if batch_window > 0:
+            self._batcher = IdentificationBatcher(
+                generator.identify_batch_async,
+                max_batch_size=max_batch_size,
+                max_batch_chars=generator._MAX_PACKED_IDENTIFICATION_CHARS,
+                window=batch_window,
+            )
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    @property
+    def identify(self):
+        return self._batcher.identify if self._batcher is not None else None
+
+    def status(self) -> dict:
+        status = dict(self.stats)
+        status.update(
+            queued=self._queue.qsize(), busy=self._busy, workers=self._workers
+        )
+        if self._batcher is not None:
+            status["identification_batches"] = dict(self._batcher.stats)
+        return status
+
+    def start(self) -> None:
+        self._worker_tasks = [
+            asyncio.ensure_future(self._work()) for _ in range(self._workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    def submit(self, job: Job) -> asyncio.Future:
+        """Queues ``job``; raises ``asyncio.QueueFull`` when the queue is full."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((job, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise
+        self.stats["accepted"] += 1
+        return future
+
+    async def _work(self) -> None:
+        while True:
+            job, future = await self._queue.get()
+            if future.cancelled():
+                # The client went away while the request was queued.
+                continue
+            self._busy += 1
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.stats["completed"] += 1
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._busy -= 1
+
+
+_GENERATOR_KEY = web.AppKey("generator", MealGenerator)
+_SERVICE_KEY = web.AppKey("service", MealService)
+_COUNTRY_KEY = web.AppKey("country_code", str)
+
+
+async def _read_request(request: web.Request) -> Tuple[str, str]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Request body must be JSON.")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Request body must be a JSON object.")
+    description = body.get("description")
+    if not isinstance(description, str) or not description.strip():
+        raise web.HTTPBadRequest(text="'description' must be a non-empty string.")
+    country_code = body.get("country_code", request.app[_COUNTRY_KEY])
+    if not isinstance(country_code, str) or not country_code.strip():
+        raise web.HTTPBadRequest(text="'country_code' must be a non-empty string.")
+    return description, country_code
+
+
+async def _run_job(request: web.Request, job: Job) -> Any:
+    service = request.app[_SERVICE_KEY]
+    try:
+        future = service.submit(job)
+    except asyncio.QueueFull:
+        raise web.HTTPServiceUnavailable(
+            text="Server is at capacity; retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await future
+    except CircuitOpenError as e:
+        raise web.HTTPServiceUnavailable(text=str(e), headers={"Retry-After": "5"})
+    except MealGenerationError as e:
+        raise web.HTTPUnprocessableEntity(text=str(e))
+    finally:
+        # Drop queued work whose client has disconnected.
+        future.cancel()
+
+
+async def handle_meal(request: web.Request) -> web.Response:
+    description, country_code = await _read_request(request)
+    generator = request.app[_GENERATOR_KEY]
+    identify = request.app[_SERVICE_KEY].identify
+    meal = await _run_job(
+        request,
+        lambda: generator._generate_meal_async(description, country_code, identify),
+    )
+    return web.json_response(meal.as_dict())
+
+
+async def handle_components(request: web.Request) -> web.Response:
+    description, country_code = await _read_request(request)
+    generator = request.app[_GENERATOR_KEY]
+    identify = request.app[_SERVICE_KEY].identify
+    components = await _run_job(
+        request,
+        lambda: generator._generate_component_async(
+            description, country_code, identify
+        ),
+    )
+    return web.json_response(
+        {"components": [component.as_dict() for component in components]}
+    )
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response(request.app[_SERVICE_KEY].status())
+
+
+def create_app(
+    generator: MealGenerator,
+    workers: int = 8,
+    queue_size: int = 64,
+    batch_window: float = 0.02,
+    max_batch_size: int = 16,
+    country_code: str = "GB",
+    close_generator: bool = False,
+) -> web.Application:
+    """
+    Builds an aiohttp application serving ``POST /meal``, ``POST
+    /components`` (JSON body ``{"description": ..., "country_code": ...}``)
+    and ``GET /health``. See ``MealService`` for the queueing parameters.
+    """
+    app = web.Application()
+    app[_GENERATOR_KEY] = generator
+    app[_COUNTRY_KEY] = country_code
+
+    async def _on_startup(app: web.Application) -> None:
+        service = MealService(
+            generator, workers, queue_size, batch_window, max_batch_size
+        )
+        service.start()
+        app[_SERVICE_KEY] = service
+
+    async def _on_cleanup(app: web.Application) -> None:
+        await app[_SERVICE_KEY].stop()
+        if close_generator:
+            await generator.aclose()
+
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    app.router.add_post("/meal", handle_meal)
+    app.router.add_post("/components", handle_components)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve meal generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=0.02,
+        help="Seconds to wait for identification requests to batch; 0 disables.",
+    )
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--country", default="GB")
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(
+        MealGenerator(model_name=args.model),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        batch_window=args.batch_window,
+        max_batch_size=args.max_batch_size,
+        country_code=args.country,
+        close_generator=True,
+    )
+    web.run_app(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from typing import List, Optional
+
+
+class JSONArrayItemParser:
+    """
+    Incrementally extracts the items of a JSON array from streamed text.
+
+    The parser watches for the first array stored under ``key`` (at any depth)
+    and, as text is fed in, returns the raw JSON text of each object in that
+    array as soon as its closing brace arrives. It only tracks nesting and
+    string state; each returned item should still be validated by the caller.
+    """
+
+    def __init__(self, key: str):
+        self._key = key
+        self._text = ""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._array_closed = False
+        self._item_start: Optional[int] = None
+        self._position = 0
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return self._text
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consumes a chunk and returns the array items completed by it."""
+        self._text += chunk
+        text = self._text
+        items = []
+        for char in chunk:
+            position = self._position
+            self._position += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1 : position]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char == ":":
+                self._pending_key = self._last_string
+            elif char in "{[":
+                if (
+                    char == "["
+                    and self._array_depth is None
+                    and self._pending_key == self._key
+                ):
+                    self._array_depth = len(self._stack) + 1
+                elif (
+                    char == "{"
+                    and not self._array_closed
+                    and self._array_depth is not None
+                    and len(self._stack) == self._array_depth
+                ):
+                    self._item_start = position
+                self._stack.append(char)
+                self._pending_key = None
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if (
+                    char == "}"
+                    and self._item_start is not None
+                    and len(self._stack) == self._array_depth
+                ):
+                    items.append(text[self._item_start : position + 1])
+                    self._item_start = None
+                elif (
+                    char == "]"
+                    and self._array_depth is not None
+                    and len(self._stack) == self._array_depth - 1
+                ):
+                    self._array_closed = True
+            elif char == ",":
+                self._pending_key = None
+        return items
@@ -0,0 +1,415 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Union
+
+import aiohttp
+from google.genai import types
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .llm_cache import LLMResponseCache
+
+logger = logging.getLogger(__name__)
+
+Latency = Union[float, Callable[[], float]]
+
+
+class CassetteMissError(Exception):
+    """Raised when a replayed request has no recorded exchange."""
+
+    pass
+
+
+@dataclass
+class TransportResponse:
+    """The parts of an HTTP response the Retriever reads."""
+
+    status: int
+    body: bytes = b""
+    headers: Mapping[str, str] = field(default_factory=dict)
+    url: str = ""
+
+    def raise_for_status(self) -> None:
+        if self.status < 400:
+            return
+        url = URL(self.url)
+        request_info = aiohttp.RequestInfo(
+            url, "GET", CIMultiDictProxy(CIMultiDict()), url
+        )
+        raise aiohttp.ClientResponseError(
+            request_info, (), status=self.status, message=f"HTTP {self.status}"
+        )
+
+
+class AiohttpTransport:
+    """Sends Retriever requests over its pooled ``aiohttp`` session."""
+
+    async def get(
+        self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any]
+    ) -> TransportResponse:
+        async with session.get(url, params=params) as response:
+            body = await response.read()
+            return TransportResponse(
+                status=response.status,
+                body=body,
+                headers=response.headers,
+                url=str(response.url),
+            )
+
+
+class Cassette:
+    """
+    Recorded request/response exchanges, stored as one JSON file.
+
+    Exchanges are keyed on a fingerprint of the request. A key recorded
+    several times replays its responses in recording order and then keeps
+    repeating the last one. One cassette can hold both model calls and
+    Open Food Facts searches. It is safe to share between threads; ``stats``
+    counts recorded, replayed and missing exchanges.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._exchanges: List[Dict[str, Any]] = []
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, int] = {}
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for exchange in json.load(f)["exchanges"]:
+                    self._add(exchange)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._exchanges)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _add(self, exchange: Dict[str, Any]) -> None:
+        self._exchanges.append(exchange)
+        self._index.setdefault(exchange["key"], []).append(exchange["response"])
+
+    def record(
+        self, key: str, request: Dict[str, Any], response: Dict[str, Any]
+    ) -> None:
+        with self._lock:
+            self._add({"key": key, "request": request, "response": response})
+            self._stats["recorded"] += 1
+
+    def play(self, key: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the next recorded response for ``key``."""
+        with self._lock:
+            responses = self._index.get(key)
+            if not responses:
+                self._stats["misses"] += 1
+                message = (
+                    f"No recorded exchange for {request.get('kind')} request "
+                    f"{json.dumps(request, default=str)[:200]}."
+                )
+                logger.warning(message)
+                raise CassetteMissError(message)
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self._stats["replayed"] += 1
+            return responses[min(position, len(responses) - 1)]
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Writes the cassette, atomically replacing any existing file."""
+        path = path or self._path
+        if not path:
+            raise ValueError("Cassette has no path to save to.")
+        with self._lock:
+            document = {"version": 1, "exchanges": list(self._exchanges)}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=1, ensure_ascii=False)
+        os.replace(temp_path, path)
+        logger.info(f"Saved {len(document['exchanges'])} exchanges to '{path}'.")
+
+
+async def _inject_latency(
+    latency: Optional[Latency], recorded: Optional[float] = None
+) -> None:
+    delay = recorded or 0.0
+    if latency is not None:
+        delay += latency() if callable(latency) else latency
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def _http_request(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "kind": "http",
+        "url": url,
+        "params": {name: str(value) for name, value in sorted(params.items())},
+    }
+
+
+def _http_key(request: Dict[str, Any]) -> str:
+    material = json.dumps(request, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(material).hexdigest()
+
+
+class RecordingTransport:
+    """
+    Passes Retriever requests to ``inner`` (by default the real HTTP
+    transport) and records every response in ``cassette``. Requests that
+    fail without a response, e.g. on a timeout, are not recorded.
+    """
+
+    def __init__(self, cassette: Cassette, inner: Optional[Any] = None):
+        self._cassette = cassette
+        self._inner = inner or AiohttpTransport()
+
+    async def get(
+        self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any]
+    ) -> TransportResponse:
+        started = time.monotonic()
+        response = await self._inner.get(session, url, params)
+        request = _http_request(url, params)
+        self._cassette.record(
+            _http_key(request),
+            request,
+            {
+                "status": response.status,
+                "headers": (
+                    {"Retry-After": response.headers["Retry-After"]}
+                    if "Retry-After" in response.headers
+                    else {}
+                ),
+                "body": response.body.decode("utf-8"),
+                "elapsed": time.monotonic() - started,
+            },
+        )
+        return response
+
+
+class ReplayTransport:
+    """
+    Serves Retriever requests from ``cassette`` without touching the network.
+
+    Each response is delayed by ``latency`` seconds (a number, or a callable
+    drawing one per request) plus, with ``recorded_latency=True``, the time
+    the original request took. An unrecorded request raises
+    ``CassetteMissError``.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Optional[Latency] = None,
+        recorded_latency: bool = False,
+    ):
+        self._cassette = cassette
+        self._latency = latency
+        self._recorded_latency = recorded_latency
+
+    async def get(
+        self, session: Optional[aiohttp.ClientSession], url: str, params: Dict[str, Any]
+    ) -> TransportResponse:
+        request = _http_request(url, params)
+        recorded = self._cassette.play(_http_key(request), request)
+        await _inject_latency(
+            self._latency, recorded["elapsed"] if self._recorded_latency else None
+        )
+        return TransportResponse(
+            status=recorded["status"],
+            body=recorded["body"].encode("utf-8"),
+            headers=dict(recorded["headers"]),
+            url=url,
+        )
+
+
+def _llm_request(model: str, contents: Any) -> Dict[str, Any]:
+    return {"kind": "llm", "model": model, "contents": contents}
+
+
+def _llm_key(model: str, contents: Any, config: Any) -> str:
+    # The same fingerprint as the response cache: model, prompt and schema.
+    return LLMResponseCache.make_key(
+        model,
+        contents if isinstance(contents, str) else json.dumps(contents, default=str),
+        getattr(config, "response_schema", None),
+    )
+
+
+def _usage_dict(usage_metadata: Any) -> Optional[Dict[str, Optional[int]]]:
+    if usage_metadata is None:
+        return None
+    return {
+        "prompt_token_count": usage_metadata.prompt_token_count,
+        "candidates_token_count": usage_metadata.candidates_token_count,
+        "total_token_count": usage_metadata.total_token_count,
+    }
+
+
+def _build_response(
+    text: str, usage: Optional[Dict[str, Optional[int]]] = None
+) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)])
+            )
+        ],
+        usage_metadata=(
+            types.GenerateContentResponseUsageMetadata(**usage) if usage else None
+        ),
+    )
+
+
+class _RecordingModels:
+    def __init__(self, models: Any, cassette: Cassette):
+        self._models = models
+        self._cassette = cassette
+
+    async def get(self, **kwargs) -> Any:
+        return await self._models.get(**kwargs)
+
+    async def generate_content(self, model: str, contents: Any, config: Any) -> Any:
+        started = time.monotonic()
+        response = await self._models.generate_content(
+            model=model, contents=contents, config=config
+        )
+        self._cassette.record(
+            _llm_key(model, contents, config),
+            _llm_request(model, contents),
+            {
+                "chunks": [response.text or ""],
+                "elapsed": [time.monotonic() - started],
+                "usage": _usage_dict(response.usage_metadata),
+            },
+        )
+        return response
+
+    async def generate_content_stream(
+        self, model: str, contents: Any, config: Any
+    ) -> AsyncIterator[Any]:
+        started = time.monotonic()
+        stream = await self._models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+
+        async def _record() -> AsyncIterator[Any]:
+            chunks: List[str] = []
+            elapsed: List[float] = []
+            usage = None
+            last = started
+            async for chunk in stream:
+                now = time.monotonic()
+                chunks.append(chunk.text or "")
+                elapsed.append(now - last)
+                last = now
+                usage = _usage_dict(chunk.usage_metadata) or usage
+                yield chunk
+            # Only complete streams are recorded.
+            self._cassette.record(
+                _llm_key(model, contents, config),
+                _llm_request(model, contents),
+                {"chunks": chunks, "elapsed": elapsed, "usage": usage},
+            )
+
+        return _record()
+
+
+class _ReplayModels:
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Optional[Latency],
+        recorded_latency: bool,
+    ):
+        self._cassette = cassette
+        self._latency = latency
+        self._recorded_latency = recorded_latency
+
+    def _play(self, model: str, contents: Any, config: Any) -> Dict[str, Any]:
+        return self._cassette.play(
+            _llm_key(model, contents, config), _llm_request(model, contents)
+        )
+
+    async def get(self, model: str, **kwargs) -> types.Model:
+        return types.Model(name=model)
+
+    async def generate_content(
+        self, model: str, contents: Any, config: Any
+    ) -> types.GenerateContentResponse:
+        recorded = self._play(model, contents, config)
+        await _inject_latency(
+            self._latency,
+            sum(recorded["elapsed"]) if self._recorded_latency else None,
+        )
+        return _build_response("".join(recorded["chunks"]), recorded["usage"])
+
+    async def generate_content_stream(
+        self, model: str, contents: Any, config: Any
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        recorded = self._play(model, contents, config)
+
+        async def _replay() -> AsyncIterator[types.GenerateContentResponse]:
+            # Injected latency delays the first chunk (time to first token);
+            # recorded latency also restores the gaps between chunks.
+            last = len(recorded["chunks"]) - 1
+            for position, text in enumerate(recorded["chunks"]):
+                await _inject_latency(
+                    self._latency if position == 0 else None,
+                    recorded["elapsed"][position] if self._recorded_latency else None,
+                )
+                yield _build_response(
+                    text, recorded["usage"] if position == last else None
+                )
+
+        return _replay()
+
+
+class _AsyncSurface:
+    def __init__(self, models: Any, close: Callable[[], Any]):
+        self.models = models
+        self._close = close
+
+    async def aclose(self) -> None:
+        result = self._close()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+class RecordingGenaiClient:
+    """
+    Wraps a ``genai.Client`` and records each completed model call in
+    ``cassette``. Pass it to ``MealGenerator(genai_client=...)`` (or a
+    ``ClientPool``) in place of the client. Failed calls are not recorded.
+    """
+
+    def __init__(self, client: Any, cassette: Cassette):
+        self.aio = _AsyncSurface(
+            _RecordingModels(client.aio.models, cassette), client.aio.aclose
+        )
+
+
+class ReplayGenaiClient:
+    """
+    A stand-in for ``genai.Client`` that answers model calls from
+    ``cassette``. ``latency`` and ``recorded_latency`` work as for
+    ``ReplayTransport``; streamed responses are replayed chunk by chunk. An
+    unrecorded prompt raises ``CassetteMissError``.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Optional[Latency] = None,
+        recorded_latency: bool = False,
+    ):
+        self.aio = _AsyncSurface(
+            _ReplayModels(cassette, latency, recorded_latency), lambda: None
+        )
@@ -1,4 +1,7 @@
 import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from src.meal_generator.nutrient_profile import NutrientProfile
 from src.meal_generator.meal_component import MealComponent
 from src.meal_generator.models import ComponentType, DataSource
@@ -34,4 +37,35 @@ def meal_component_fixt(nutrient_profile_fixt: NutrientProfile) -> MealComponent
         nutrient_profile=nutrient_profile_fixt,
         brand="Farm Fresh",
         source_url="http://example.com/chicken",
-    )
\ No newline at end of file
+    )
+
+
+@pytest_asyncio.fixture
+async def start_off_server():
+    """
+    Starts local stand-ins for the Open Food Facts search endpoint.
+
+    Call it with an async ``search(request)`` handler; the returned server
+    records each request's query parameters in ``server.requests`` and is
+    closed when the test finishes.
+    """
+    servers = []
+
+    async def start(search) -> TestServer:
+        requests = []
+
+        async def handler(request: web.Request) -> web.StreamResponse:
+            requests.append(dict(request.query))
+            return await search(request)
+
+        app = web.Application()
+        app.router.add_get("/cgi/search.pl", handler)
+        server = TestServer(app)
+        await server.start_server()
+        server.requests = requests
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        await server.close()
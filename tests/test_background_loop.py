@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from src.meal_generator.background_loop import BackgroundLoop
+
+
+@pytest.fixture
+def background_loop():
+    loop = BackgroundLoop()
+    yield loop
+    loop.close()
+
+
+def test_run_reuses_one_loop_across_calls(background_loop: BackgroundLoop):
+    """Tests that consecutive calls run on the same long-lived loop."""
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = background_loop.run(current_loop())
+    second = background_loop.run(current_loop())
+    assert first is second is background_loop.loop
+    assert first.is_running()
+
+
+@pytest.mark.asyncio
+async def test_run_works_inside_a_running_loop(background_loop: BackgroundLoop):
+    """Tests that the sync API can be called from a thread running a loop."""
+
+    async def answer():
+        await asyncio.sleep(0)
+        return 42
+
+    assert background_loop.run(answer()) == 42
+
+
+def test_run_from_the_background_loop_is_rejected(background_loop: BackgroundLoop):
+    """Tests that a nested run on the loop thread fails instead of deadlocking."""
+
+    async def nested():
+        background_loop.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match="background loop"):
+        background_loop.run(nested())
+
+
+def test_iterate_drives_an_async_generator(background_loop: BackgroundLoop):
+    """Tests that iteration yields each item and closes the generator early."""
+    closed = []
+
+    async def numbers():
+        try:
+            for number in range(5):
+                yield number
+        finally:
+            closed.append(True)
+
+    assert list(background_loop.iterate(numbers())) == [0, 1, 2, 3, 4]
+    iterator = background_loop.iterate(numbers())
+    assert next(iterator) == 0
+    iterator.close()
+    assert closed == [True, True]
+
+
+def test_close_restarts_on_next_use(background_loop: BackgroundLoop):
+    """Tests that a closed loop is replaced by a fresh one on demand."""
+    first = background_loop.loop
+    background_loop.close()
+    assert first.is_closed()
+    assert background_loop.run(asyncio.sleep(0, result="ok")) == "ok"
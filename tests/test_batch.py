@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from src.meal_generator.batch import IdentificationBatcher
+
+
+@pytest.mark.asyncio
+async def test_batcher_packs_concurrent_requests_within_window():
+    """Tests that requests arriving together share one batch call."""
+    calls = []
+
+    async def identify_many(descriptions):
+        calls.append(list(descriptions))
+        return [d.upper() for d in descriptions]
+
+    batcher = IdentificationBatcher(identify_many, window=0.01)
+    results = await asyncio.gather(*(batcher.identify(d) for d in ["a", "b", "c"]))
+
+    assert results == ["A", "B", "C"]
+    assert calls == [["a", "b", "c"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_splits_batches_by_size_and_length():
+    """Tests automatic batch sizing by item count and prompt length."""
+    calls = []
+
+    async def identify_many(descriptions):
+        calls.append(list(descriptions))
+        return descriptions
+
+    batcher = IdentificationBatcher(
+        identify_many, max_batch_size=2, max_batch_chars=10, window=0.01
+    )
+    await asyncio.gather(
+        *(batcher.identify(d) for d in ["a", "b", "c", "dddddddd", "ee"])
+    )
+
+    assert calls == [["a", "b"], ["c", "dddddddd"], ["ee"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_per_item_and_batch_errors():
+    """Tests that item errors and whole-batch failures reach the right callers."""
+
+    async def identify_many(descriptions):
+        if "boom" in descriptions:
+            raise RuntimeError("batch failed")
+        return [ValueError(d) if d == "bad" else d for d in descriptions]
+
+    batcher = IdentificationBatcher(identify_many, window=0.01)
+    ok, bad = await asyncio.gather(
+        batcher.identify("ok"), batcher.identify("bad"), return_exceptions=True
+    )
+    assert ok == "ok"
+    assert isinstance(bad, ValueError)
+    with pytest.raises(RuntimeError):
+        await batcher.identify("boom")
@@ -0,0 +1,50 @@
+import pytest
+from src.meal_generator.cache import TTLCache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_hit_and_miss_stats():
+    """Tests that hits and misses are counted."""
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b", None) is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_cache_missing_key_raises():
+    """Tests that a miss without a default raises KeyError."""
+    with pytest.raises(KeyError):
+        TTLCache().get("missing")
+
+
+def test_cache_entries_expire():
+    """Tests that entries are dropped once their TTL has elapsed."""
+    clock = _FakeClock()
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 11
+    assert cache.get("a", None) is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    """Tests LRU eviction once the size bound is exceeded."""
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b", None) is None
+    assert cache.get("a") == 1
+    assert cache.stats.evictions == 1
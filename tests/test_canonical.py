@@ -0,0 +1,56 @@
+import pytest
+from src.meal_generator.canonical import QueryCanonicalizer, singularize
+
+
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        ("breasts", "breast"),
+        ("berries", "berry"),
+        ("tomatoes", "tomato"),
+        ("sandwiches", "sandwich"),
+        ("hummus", "hummus"),
+        ("glass", "glass"),
+        ("eggs", "egg"),
+        ("gas", "gas"),
+        ("cookies", "cookie"),
+        ("brownies", "brownie"),
+        ("smoothies", "smoothie"),
+        ("veggies", "veggie"),
+        ("cookie", "cookie"),
+    ],
+)
+def test_singularize(token, expected):
+    """Tests plural stemming of common food words."""
+    assert singularize(token) == expected
+
+
+def test_canonicalize_folds_case_punctuation_and_order():
+    """Tests that trivially different queries share a canonical form."""
+    canonicalizer = QueryCanonicalizer()
+    assert (
+        canonicalizer.canonicalize("Chicken Breasts")
+        == canonicalizer.canonicalize("breast, chicken")
+        == "breast chicken"
+    )
+    assert canonicalizer.canonicalize(None) == ""
+
+
+def test_canonicalize_ie_plurals_match_singulars():
+    """Tests that '-ie' foods share a key with their plurals."""
+    canonicalizer = QueryCanonicalizer()
+    assert canonicalizer.canonicalize("Cookies") == canonicalizer.canonicalize(
+        "cookie"
+    )
+    assert canonicalizer.canonicalize("berries") == canonicalizer.canonicalize(
+        "berry"
+    )
+
+
+def test_canonicalize_applies_synonyms():
+    """Tests phrase-level and token-level synonym replacement."""
+    canonicalizer = QueryCanonicalizer(
+        synonyms={"Grilled chicken breasts": "chicken breast", "coke": "coca cola"}
+    )
+    assert canonicalizer.canonicalize("grilled chicken breast") == "breast chicken"
+    assert canonicalizer.canonicalize("Coke Zero") == "coca cola zero"
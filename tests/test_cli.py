@@ -0,0 +1,211 @@
+import asyncio
+import io
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from google.genai import errors
+
+from src.meal_generator.cli import Checkpoint, main, process_jsonl
+from src.meal_generator.generator import (
+    CircuitOpenError,
+    MealGenerationError,
+    MealGenerator,
+)
+
+
+def _fake_meal(description: str) -> MagicMock:
+    meal = MagicMock()
+    meal.as_dict.return_value = {"name": description}
+    return meal
+
+
+async def _fake_generate(description: str, country_code: str) -> MagicMock:
+    if description == "bad":
+        raise MealGenerationError("Input was determined to be malicious.")
+    return _fake_meal(description)
+
+
+def _records(output: str) -> list:
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def test_checkpoint_advances_watermark_over_contiguous_lines(tmp_path):
+    """Tests that out-of-order completions only advance the watermark once contiguous."""
+    path = tmp_path / "run.checkpoint"
+    checkpoint = Checkpoint(str(path))
+    checkpoint.mark_done(2)
+    checkpoint.mark_done(4)
+    assert checkpoint.watermark == 0
+    checkpoint.mark_done(1)
+    assert checkpoint.watermark == 2
+    checkpoint.save()
+
+    reloaded = Checkpoint(str(path))
+    assert reloaded.watermark == 2
+    assert [reloaded.is_done(line) for line in range(1, 6)] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert json.loads(path.read_text()) == {"watermark": 2, "done": [4]}
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_process_jsonl_writes_results_and_errors(mock_generate: AsyncMock):
+    """Tests that every input line yields exactly one output record."""
+    mock_generate.side_effect = _fake_generate
+    input_stream = io.StringIO(
+        '{"id": "a", "description": "toast"}\n'
+        '"porridge"\n'
+        "\n"
+        '{"id": "c", "description": "bad"}\n'
+        "not json\n"
+    )
+    output_stream = io.StringIO()
+
+    stats = await process_jsonl(
+        MealGenerator(api_key="dummy"), input_stream, output_stream, concurrency=2
+    )
+
+    records = sorted(_records(output_stream.getvalue()), key=lambda r: r["line"])
+    assert stats == {"processed": 2, "failed": 2, "retryable": 0, "skipped": 0}
+    assert records[0] == {"line": 1, "id": "a", "meal": {"name": "toast"}}
+    assert records[1] == {"line": 2, "id": None, "meal": {"name": "porridge"}}
+    assert records[2]["line"] == 4 and "malicious" in records[2]["error"]
+    assert records[3]["line"] == 5 and records[3]["error"].startswith("Invalid")
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_process_jsonl_resumes_from_checkpoint(
+    mock_generate: AsyncMock, tmp_path
+):
+    """Tests that a resumed run skips every line the checkpoint marks as done."""
+    mock_generate.side_effect = _fake_generate
+    path = str(tmp_path / "run.checkpoint")
+    with open(path, "w") as f:
+        json.dump({"watermark": 2, "done": [4]}, f)
+    input_stream = io.StringIO("".join(f'"meal {i}"\n' for i in range(1, 7)))
+    output_stream = io.StringIO()
+
+    stats = await process_jsonl(
+        MealGenerator(api_key="dummy"),
+        input_stream,
+        output_stream,
+        Checkpoint(path),
+        checkpoint_every=1,
+    )
+
+    processed = sorted(r["line"] for r in _records(output_stream.getvalue()))
+    assert processed == [3, 5, 6]
+    assert stats["skipped"] == 3
+    assert Checkpoint(path).watermark == 6
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_transient_failures_are_retried_on_resume(
+    mock_generate: AsyncMock, tmp_path
+):
+    """Tests that rows failed by an outage are not checkpointed as done."""
+    outage = True
+
+    async def generate(description: str, country_code: str) -> MagicMock:
+        if outage and description == "meal 2":
+            raise CircuitOpenError("The AI model is unavailable.")
+        if outage and description == "meal 3":
+            raise MealGenerationError("retries exhausted") from errors.APIError(
+                503, {}
+            )
+        return await _fake_generate(description, country_code)
+
+    mock_generate.side_effect = generate
+    path = str(tmp_path / "run.checkpoint")
+    lines = '"meal 1"\n"meal 2"\n"meal 3"\n"bad"\n'
+
+    output_stream = io.StringIO()
+    stats = await process_jsonl(
+        MealGenerator(api_key="dummy"),
+        io.StringIO(lines),
+        output_stream,
+        Checkpoint(path),
+    )
+    assert stats["failed"] == 3 and stats["retryable"] == 2
+    retryable = {
+        r["line"]: r.get("retryable", False)
+        for r in _records(output_stream.getvalue())
+    }
+    assert retryable == {1: False, 2: True, 3: True, 4: False}
+
+    outage = False
+    output_stream = io.StringIO()
+    stats = await process_jsonl(
+        MealGenerator(api_key="dummy"),
+        io.StringIO(lines),
+        output_stream,
+        Checkpoint(path),
+    )
+    processed = sorted(r["line"] for r in _records(output_stream.getvalue()))
+    assert processed == [2, 3]
+    assert stats == {"processed": 2, "failed": 0, "retryable": 0, "skipped": 2}
+    assert Checkpoint(path).watermark == 4
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_cancelled_run_saves_checkpoint(mock_generate: AsyncMock, tmp_path):
+    """Tests that rows finished before a cancellation are kept in the checkpoint."""
+    stalled = asyncio.Event()
+
+    async def generate(description: str, country_code: str) -> MagicMock:
+        if description == "meal 4":
+            stalled.set()
+            await asyncio.Event().wait()
+        return _fake_meal(description)
+
+    mock_generate.side_effect = generate
+    path = str(tmp_path / "run.checkpoint")
+    input_stream = io.StringIO("".join(f'"meal {i}"\n' for i in range(1, 7)))
+    output_stream = io.StringIO()
+
+    run = asyncio.ensure_future(
+        process_jsonl(
+            MealGenerator(api_key="dummy"),
+            input_stream,
+            output_stream,
+            Checkpoint(path),
+            concurrency=1,
+        )
+    )
+    await asyncio.wait_for(stalled.wait(), 1)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    assert len(_records(output_stream.getvalue())) == 3
+    assert Checkpoint(path).watermark == 3
+
+
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+def test_main_appends_output_and_skips_done_rows_on_rerun(
+    mock_generate: AsyncMock, tmp_path, monkeypatch
+):
+    """Tests that re-running the CLI over the same input does not redo rows."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "dummy")
+    mock_generate.side_effect = _fake_generate
+    input_path = tmp_path / "in.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    input_path.write_text('"toast"\n"eggs"\n')
+
+    assert main([str(input_path), "-o", str(output_path)]) == 0
+    with open(input_path, "a") as f:
+        f.write('"beans"\n')
+    assert main([str(input_path), "-o", str(output_path)]) == 0
+
+    names = [r["meal"]["name"] for r in _records(output_path.read_text())]
+    assert sorted(names) == ["beans", "eggs", "toast"]
+    assert mock_generate.await_count == 3
+    assert Checkpoint(f"{output_path}.checkpoint").watermark == 3
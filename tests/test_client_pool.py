@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import pytest
+from src.meal_generator.client_pool import ClientPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_acquire_balances_by_outstanding_requests():
+    """Tests that each call goes to the client with the fewest in flight."""
+    pool = ClientPool(clients=["a", "b", "c"])
+    async with pool.acquire() as first:
+        async with pool.acquire() as second:
+            async with pool.acquire() as third:
+                assert {first, second, third} == {"a", "b", "c"}
+            async with pool.acquire() as fourth:
+                assert fourth == third
+    assert [member["requests"] for member in pool.stats] == [1, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_per_key_concurrency_cap_makes_callers_wait():
+    """Tests that callers wait while every key is at its concurrency cap."""
+    pool = ClientPool(clients=["a"], max_concurrency_per_key=1)
+    order = []
+
+    async def call(name: str):
+        async with pool.acquire():
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+
+    await asyncio.gather(call("first"), call("second"))
+    assert order == ["first start", "first end", "second start", "second end"]
+
+
+@pytest.mark.asyncio
+async def test_quota_exhausted_client_is_ejected_temporarily():
+    """Tests that an ejected key is skipped until its ejection expires."""
+    clock = FakeClock()
+    pool = ClientPool(clients=["a", "b"], ejection_time=30.0, clock=clock)
+    pool.report_quota_exhausted("a")
+
+    for _ in range(3):
+        async with pool.acquire() as client:
+            assert client == "b"
+    assert pool.stats[0]["ejected"] and pool.stats[0]["quota_ejections"] == 1
+
+    clock.now = 31.0
+    async with pool.acquire() as first:
+        async with pool.acquire() as second:
+            assert {first, second} == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_release_wakes_waiter_on_another_event_loop():
+    """Tests that a slot freed on one thread's loop wakes a waiter on another."""
+    pool = ClientPool(clients=["a"], max_concurrency_per_key=1)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold_slot():
+        async def _hold():
+            async with pool.acquire():
+                holding.set()
+                await asyncio.to_thread(release.wait)
+
+        asyncio.run(_hold())
+
+    thread = threading.Thread(target=hold_slot)
+    thread.start()
+    await asyncio.to_thread(holding.wait)
+
+    waiter = asyncio.ensure_future(pool.acquire().__aenter__())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    release.set()
+    assert await asyncio.wait_for(waiter, 1) == "a"
+    thread.join()
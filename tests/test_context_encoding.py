@@ -0,0 +1,104 @@
+import json
+
+from src.meal_generator.context_encoding import (
+    ContextEncoder,
+    estimate_tokens,
+    iter_trimmed_contexts,
+)
+
+CONTEXT = [
+    {
+        "user_query": "Chips",
+        "brand": None,
+        "data_source": "estimated_with_context",
+        "contextual_examples": [
+            {"name": "Frites", "brand": None, "weight_g": 150.0, "energy_kcal": 466.53},
+            {
+                "name": "Oven chips",
+                "brand": "Tesco",
+                "weight_g": 125.0,
+                "energy_kcal": 181.25000000000003,
+            },
+        ],
+    },
+    {
+        "user_query": "Beans",
+        "nutrients_per_100g": {"energy": 78.3456, "salt": 0.0125, "fibre": 0.0},
+    },
+]
+
+
+def test_compact_encoding_minifies_drops_nulls_and_rounds():
+    """Tests minified output without nulls and with rounded numbers."""
+    encoded = ContextEncoder().encode(CONTEXT)
+
+    assert " " not in encoded.replace("Oven chips", "")
+    assert "null" not in encoded
+    decoded = json.loads(encoded)
+    assert decoded[0]["contextual_examples"][0] == {
+        "name": "Frites",
+        "weight_g": 150,
+        "energy_kcal": 466.53,
+    }
+    assert decoded[0]["contextual_examples"][1]["energy_kcal"] == 181.25
+    assert decoded[1]["nutrients_per_100g"] == {
+        "energy": 78.35,
+        "salt": 0.01,
+        "fibre": 0,
+    }
+
+
+def test_tabular_examples():
+    """Tests that contextual examples are written as columns and rows."""
+    decoded = json.loads(ContextEncoder(tabular_examples=True).encode(CONTEXT))
+
+    assert decoded[0]["contextual_examples"] == {
+        "columns": ["name", "weight_g", "energy_kcal", "brand"],
+        "rows": [["Frites", 150, 466.53, None], ["Oven chips", 125, 181.25, "Tesco"]],
+    }
+
+
+def test_non_compact_encoding_matches_original_layout():
+    """Tests that compact=False reproduces the original indented JSON."""
+    assert ContextEncoder(compact=False).encode(CONTEXT) == json.dumps(
+        CONTEXT, indent=2
+    )
+
+
+def test_estimate_tokens():
+    """Tests the chars/4 token estimate, rounding up."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_iter_trimmed_contexts_trims_by_priority():
+    """Tests that examples, brands, URLs and finally all examples are trimmed."""
+    context = [
+        {
+            "user_query": "Chips",
+            "data_source": "estimated_with_context",
+            "contextual_examples": [
+                {"name": "A", "brand": "X", "energy_kcal": 1},
+                {"name": "B", "brand": "Y", "energy_kcal": 2},
+                {"name": "C", "brand": "Z", "energy_kcal": 3},
+            ],
+        },
+        {
+            "user_query": "Beans",
+            "data_source": "retrieved_api",
+            "found_brand": "Heinz",
+            "source_url": "https://example.org/beans",
+        },
+    ]
+    steps = list(iter_trimmed_contexts(context))
+
+    assert [len(step[0]["contextual_examples"]) for step in steps[:2]] == [2, 1]
+    assert steps[2][0]["contextual_examples"] == [{"name": "A", "energy_kcal": 1}]
+    assert "found_brand" not in steps[2][1] and "source_url" in steps[2][1]
+    assert "source_url" not in steps[3][1]
+    assert steps[-1] == [
+        {"user_query": "Chips", "data_source": "estimated_with_context"},
+        {"user_query": "Beans", "data_source": "retrieved_api"},
+    ]
+    assert len(context[0]["contextual_examples"]) == 3  # the input is untouched
@@ -1,9 +1,25 @@
+import aiohttp
+import asyncio
 import pytest
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
-from src.meal_generator.generator import MealGenerator, MealGenerationError
+from google.genai import errors
+from src.meal_generator.generator import (
+    CircuitOpenError,
+    MealGenerator,
+    MealGenerationError,
+)
 from src.meal_generator.meal import Meal
 from src.meal_generator.meal_component import MealComponent
+from src.meal_generator.llm_cache import LLMResponseCache
+from src.meal_generator.models import _IdentificationResponse, DataSource
+from src.meal_generator.cache import TTLCache
+from src.meal_generator.context_encoding import estimate_tokens
+from src.meal_generator.resilience import CircuitBreaker, RetryPolicy
+from src.meal_generator.client_pool import ClientPool
+from src.meal_generator.background_loop import BackgroundLoop
+from src.meal_generator.retriever import Retriever
 
 
 @pytest.fixture
@@ -181,3 +197,777 @@ async def test_generate_async_synthesis_fails(
         MealGenerationError, match="Input was determined to be malicious"
     ):
         await generator.generate_meal_async("some query")
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator._generate_content_async")
+async def test_call_ai_model_uses_response_cache(
+    mock_generate: AsyncMock, tmp_path, mock_identification_response: str
+):
+    """Tests that a repeated identical prompt is served from the response cache."""
+    mock_generate.return_value = mock_identification_response
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    generator = MealGenerator(api_key="dummy", response_cache=cache)
+    config = generator._create_model_config(response_schema=_IdentificationResponse)
+
+    first = await generator._call_ai_model_async("prompt", config)
+    second = await generator._call_ai_model_async("prompt", config)
+
+    assert first == second == mock_identification_response
+    mock_generate.assert_awaited_once()
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator._generate_content_async")
+async def test_invalid_responses_are_not_cached(mock_generate: AsyncMock, tmp_path):
+    """Tests that a response failing schema validation is not cached."""
+    mock_generate.return_value = '{"unexpected": true}'
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    generator = MealGenerator(api_key="dummy", response_cache=cache)
+    config = generator._create_model_config(response_schema=_IdentificationResponse)
+
+    await generator._call_ai_model_async("prompt", config)
+    await generator._call_ai_model_async("prompt", config)
+
+    assert mock_generate.await_count == 2
+    assert cache.stats["writes"] == 0
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_generate_meal_async_uses_meal_cache(
+    mock_call_ai: AsyncMock,
+    mock_retriever: AsyncMock,
+    mock_identification_response: str,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that a repeated description is served from the meal cache with new ids."""
+    mock_call_ai.side_effect = [
+        mock_identification_response,
+        mock_meal_synthesis_response,
+    ]
+    mock_retriever.return_value = [{"user_query": "Scrambled Eggs"}]
+
+    generator = MealGenerator(api_key="dummy", meal_cache=TTLCache())
+    first = await generator.generate_meal_async("Eggs on toast")
+    second = await generator.generate_meal_async("  eggs ON toast ")
+
+    assert mock_call_ai.call_count == 2
+    assert second.id != first.id
+    assert second.component_list[0].id != first.component_list[0].id
+    assert second.nutrient_profile == first.nutrient_profile
+    assert second.name == first.name
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_generate_meals_async_returns_input_order_with_errors(
+    mock_generate: AsyncMock,
+):
+    """Tests that batch results keep input order and capture per-item errors."""
+
+    async def fake_generate(description: str, country_code: str) -> str:
+        await asyncio.sleep(0.01 if description == "slow" else 0)
+        if description == "bad":
+            raise MealGenerationError("Input was determined to be malicious.")
+        return f"meal for {description}"
+
+    mock_generate.side_effect = fake_generate
+    generator = MealGenerator(api_key="dummy")
+    results = await generator.generate_meals_async(
+        ["slow", "bad", "fast"], concurrency=2
+    )
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert results[0].result == "meal for slow"
+    assert not results[1].ok
+    assert isinstance(results[1].error, MealGenerationError)
+    assert results[2].ok
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_iter_meals_async_bounds_concurrency(mock_generate: AsyncMock):
+    """Tests that no more than `concurrency` generations run at once."""
+    running = 0
+    peak = 0
+
+    async def fake_generate(description: str, country_code: str) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return description
+
+    mock_generate.side_effect = fake_generate
+    generator = MealGenerator(api_key="dummy")
+    results = [
+        r async for r in generator.iter_meals_async(map(str, range(10)), concurrency=3)
+    ]
+
+    assert len(results) == 10
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_packed_identification_demultiplexes_results(
+    mock_call_ai: AsyncMock,
+    mock_retriever: AsyncMock,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that one packed identification call serves every meal in a batch."""
+    packed_response = json.dumps(
+        {
+            "status": "ok",
+            "result": {
+                "descriptions": [
+                    {"index": 1, "status": "bad_input", "components": []},
+                    {"index": 0, "status": "ok", "components": [{"query": "eggs"}]},
+                    {"index": 2, "status": "ok", "components": [{"query": "toast"}]},
+                ]
+            },
+        }
+    )
+    identification_prompts = []
+
+    async def fake_call(prompt, config, stage=None):
+        if 'index="0"' in prompt:
+            identification_prompts.append(prompt)
+            return packed_response
+        return mock_meal_synthesis_response
+
+    mock_call_ai.side_effect = fake_call
+    mock_retriever.return_value = [{"user_query": "Scrambled Eggs"}]
+
+    generator = MealGenerator(api_key="dummy")
+    results = await generator.generate_meals_async(
+        ["eggs", "<script>", "toast"], packed_identification=True
+    )
+
+    assert len(identification_prompts) == 1
+    assert mock_call_ai.call_count == 3
+    assert results[0].ok and results[2].ok
+    assert isinstance(results[1].error, MealGenerationError)
+    identified = [c.args[0] for c in mock_retriever.call_args_list]
+    assert sorted(components[0].query for components in identified) == [
+        "eggs",
+        "toast",
+    ]
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_generate_meal_fast_async_makes_one_call(
+    mock_call_ai: AsyncMock,
+    mock_retriever: AsyncMock,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that fast mode skips identification and retrieval."""
+    mock_call_ai.return_value = mock_meal_synthesis_response.replace(
+        "estimated_model", "retrieved_api"
+    )
+
+    generator = MealGenerator(api_key="dummy")
+    meal = await generator.generate_meal_fast_async("eggs")
+
+    mock_call_ai.assert_awaited_once()
+    mock_retriever.assert_not_awaited()
+    assert all(
+        c.nutrient_profile.data_source == DataSource.ESTIMATED_MODEL
+        for c in meal.component_list
+    )
+    assert meal.nutrient_profile.data_source == DataSource.ESTIMATED_MODEL
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_fast_async")
+async def test_generate_meal_with_refinement_async(
+    mock_fast: AsyncMock, mock_full: AsyncMock
+):
+    """Tests that the fast meal is returned alongside a grounded refine task."""
+    mock_fast.return_value = "fast meal"
+    mock_full.return_value = "grounded meal"
+
+    generator = MealGenerator(api_key="dummy")
+    meal, refine_task = await generator.generate_meal_with_refinement_async("eggs")
+
+    assert meal == "fast meal"
+    assert await refine_task == "grounded meal"
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_component_async")
+@patch("src.meal_generator.generator.MealGenerator._generate_content_stream_async")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_streaming_identification_overlaps_retrieval(
+    mock_call_ai: AsyncMock,
+    mock_stream,
+    mock_process_component: AsyncMock,
+    mock_identification_response: str,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that retrieval starts for a component before the stream finishes."""
+    events = []
+    split = mock_identification_response.index("}, {") + 1
+
+    async def fake_stream(prompt, config, stage=None):
+        for chunk in (
+            mock_identification_response[:split],
+            mock_identification_response[split:],
+        ):
+            events.append("chunk")
+            yield chunk
+            await asyncio.sleep(0)  # network latency between chunks
+        events.append("stream done")
+
+    async def fake_process(component, country_code):
+        events.append(f"retrieve {component.query}")
+        return {"user_query": component.query, "data_source": "estimated_model"}
+
+    mock_stream.side_effect = fake_stream
+    mock_process_component.side_effect = fake_process
+    mock_call_ai.return_value = mock_meal_synthesis_response
+
+    generator = MealGenerator(api_key="dummy", stream_identification=True)
+    meal = await generator.generate_meal_async("eggs on toast")
+
+    assert meal.name == "Scrambled Eggs on Toast"
+    assert mock_call_ai.call_count == 1
+    assert events.index("retrieve Scrambled Eggs") < events.index("stream done")
+    assert mock_process_component.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+@patch("src.meal_generator.generator.MealGenerator._generate_content_stream_async")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_stream_meal_async_yields_components_then_meal(
+    mock_call_ai: AsyncMock,
+    mock_stream,
+    mock_retriever: AsyncMock,
+    mock_identification_response: str,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that each component is yielded before the synthesis stream ends."""
+    events = []
+    split = mock_meal_synthesis_response.index('"data_source"')
+    split = mock_meal_synthesis_response.index("}", split) + 2
+
+    async def fake_stream(prompt, config, stage=None):
+        for chunk in (
+            mock_meal_synthesis_response[:split],
+            mock_meal_synthesis_response[split:],
+        ):
+            events.append("chunk")
+            yield chunk
+        events.append("stream done")
+
+    mock_stream.side_effect = fake_stream
+    mock_call_ai.return_value = mock_identification_response
+    mock_retriever.return_value = [
+        {"user_query": "Scrambled Eggs", "data_source": "retrieved_api"}
+    ]
+
+    generator = MealGenerator(api_key="dummy")
+    items = []
+    async for item in generator.stream_meal_async("eggs"):
+        events.append(type(item).__name__)
+        items.append(item)
+
+    assert events == ["chunk", "MealComponent", "chunk", "stream done", "Meal"]
+    component, meal = items
+    assert component.nutrient_profile.data_source == DataSource.RETRIEVED_API
+    assert meal.component_list == [component]
+    assert meal.nutrient_profile.energy == component.nutrient_profile.energy
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+@patch("src.meal_generator.generator.MealGenerator._generate_content_stream_async")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_stream_components_async_rejects_bad_input(
+    mock_call_ai: AsyncMock,
+    mock_stream,
+    mock_retriever: AsyncMock,
+    mock_identification_response: str,
+    mock_component_synthesis_response: str,
+):
+    """Tests streamed components and a bad-input synthesis response."""
+
+    async def fake_stream(prompt, config, stage=None):
+        yield mock_component_synthesis_response
+
+    mock_stream.side_effect = fake_stream
+    mock_call_ai.return_value = mock_identification_response
+    mock_retriever.return_value = []
+
+    generator = MealGenerator(api_key="dummy")
+    components = [c async for c in generator.stream_components_async("oil")]
+    assert [c.name for c in components] == ["Olive Oil"]
+
+    async def bad_stream(prompt, config, stage=None):
+        yield json.dumps({"status": "bad_input"})
+
+    mock_stream.side_effect = bad_stream
+    with pytest.raises(MealGenerationError, match="malicious"):
+        async for _ in generator.stream_components_async("oil"):
+            pass
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+@patch("src.meal_generator.generator.MealGenerator._call_ai_model_async")
+async def test_synthesis_prompt_is_trimmed_to_token_budget(
+    mock_call_ai: AsyncMock,
+    mock_retriever: AsyncMock,
+    mock_identification_response: str,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that context is trimmed until the synthesis prompt fits the budget."""
+    examples = [
+        {"name": f"Example {i}", "brand": "Brand" * 20, "energy_kcal": 100.0}
+        for i in range(3)
+    ]
+    mock_retriever.return_value = [
+        {
+            "user_query": "Scrambled Eggs",
+            "data_source": "estimated_with_context",
+            "contextual_examples": examples,
+        }
+    ]
+    mock_call_ai.side_effect = [
+        mock_identification_response,
+        mock_meal_synthesis_response,
+    ] * 2
+
+    generator = MealGenerator(api_key="dummy")
+    await generator.generate_meal_async("eggs")
+    untrimmed_prompt = mock_call_ai.call_args.args[0]
+
+    budget = estimate_tokens(untrimmed_prompt) - 100
+    generator = MealGenerator(api_key="dummy", max_prompt_tokens=budget)
+    meal = await generator.generate_meal_async("eggs")
+    trimmed_prompt = mock_call_ai.call_args.args[0]
+
+    assert estimate_tokens(trimmed_prompt) <= budget
+    assert "Example 0" in trimmed_prompt and "Example 2" not in trimmed_prompt
+    assert mock_call_ai.call_args.kwargs["stage"] == "synthesize_meal"
+    assert (
+        meal.component_list[0].nutrient_profile.data_source
+        == DataSource.ESTIMATED_WITH_CONTEXT
+    )
+
+
+@pytest.mark.asyncio
+async def test_usage_stats_are_recorded_per_stage(
+    tmp_path, mock_identification_response: str
+):
+    """Tests that usage_metadata token counts and cache hits are tallied by stage."""
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    generator = MealGenerator(api_key="dummy", response_cache=cache)
+    usage = SimpleNamespace(
+        prompt_token_count=120, candidates_token_count=30, total_token_count=150
+    )
+    response = SimpleNamespace(text=mock_identification_response, usage_metadata=usage)
+    with patch.object(
+        generator._genai_client.aio.models,
+        "generate_content",
+        AsyncMock(return_value=response),
+    ):
+        assert await generator._identify_async("eggs")
+        assert await generator._identify_async("eggs")
+
+    assert generator.usage_stats == {
+        "identify": {
+            "calls": 1,
+            "cache_hits": 1,
+            "prompt_tokens": 120,
+            "output_tokens": 30,
+            "total_tokens": 150,
+        }
+    }
+
+
+def _fast_retry_policy(max_retries: int = 3) -> RetryPolicy:
+    return RetryPolicy(max_retries=max_retries, base_delay=0.0, max_delay=0.0)
+
+
+@pytest.mark.asyncio
+async def test_transient_model_errors_are_retried(mock_identification_response: str):
+    """Tests that a 503 is retried and the call then succeeds."""
+    generator = MealGenerator(
+        api_key="dummy",
+        retry_policy=_fast_retry_policy(),
+        circuit_breaker=CircuitBreaker(),
+    )
+    response = SimpleNamespace(text=mock_identification_response, usage_metadata=None)
+    generate = AsyncMock(
+        side_effect=[errors.APIError(503, {}), errors.APIError(429, {}), response]
+    )
+    with patch.object(generator._genai_client.aio.models, "generate_content", generate):
+        config = generator._create_model_config()
+        assert await generator._call_ai_model_async("p", config) == response.text
+
+    assert generate.await_count == 3
+    stats = generator.retry_stats
+    assert stats["attempts"] == 3 and stats["retries"] == 2
+    assert stats["circuit_breaker"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_model_errors_fail_immediately():
+    """Tests that a 400 is not retried and does not count against the breaker."""
+    breaker = CircuitBreaker(failure_threshold=1)
+    generator = MealGenerator(
+        api_key="dummy", retry_policy=_fast_retry_policy(), circuit_breaker=breaker
+    )
+    generate = AsyncMock(side_effect=errors.APIError(400, {}))
+    with patch.object(generator._genai_client.aio.models, "generate_content", generate):
+        with pytest.raises(MealGenerationError, match="interaction"):
+            await generator._call_ai_model_async("p", generator._create_model_config())
+
+    generate.assert_awaited_once()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_are_retried_and_open_the_breaker():
+    """Tests that connection failures are retried and never reset the breaker."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    generator = MealGenerator(
+        api_key="dummy", retry_policy=_fast_retry_policy(2), circuit_breaker=breaker
+    )
+    generate = AsyncMock(side_effect=aiohttp.ServerDisconnectedError())
+    with patch.object(generator._genai_client.aio.models, "generate_content", generate):
+        with pytest.raises(MealGenerationError):
+            await generator._call_ai_model_async("p", generator._create_model_config())
+
+    assert generate.await_count == 3
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_across_generators():
+    """Tests that a shared breaker opened by one generator rejects another's calls."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    first = MealGenerator(
+        api_key="dummy", retry_policy=_fast_retry_policy(1), circuit_breaker=breaker
+    )
+    second = MealGenerator(api_key="dummy", circuit_breaker=breaker)
+    failing = AsyncMock(side_effect=errors.APIError(503, {}))
+    with patch.object(first._genai_client.aio.models, "generate_content", failing):
+        with pytest.raises(MealGenerationError):
+            await first._call_ai_model_async("p", first._create_model_config())
+    assert first.retry_stats["retries_exhausted"] == 1
+
+    untouched = AsyncMock()
+    with patch.object(second._genai_client.aio.models, "generate_content", untouched):
+        with pytest.raises(CircuitOpenError):
+            await second._call_ai_model_async("p", second._create_model_config())
+    untouched.assert_not_awaited()
+    assert second.retry_stats["circuit_rejections"] == 1
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.Retriever.process_components_concurrently")
+async def test_stages_are_routed_to_their_models(
+    mock_retriever: AsyncMock,
+    mock_identification_response: str,
+    mock_meal_synthesis_response: str,
+):
+    """Tests that identification and synthesis use their configured models."""
+    mock_retriever.return_value = []
+    generator = MealGenerator(
+        api_key="dummy",
+        model_name="big-model",
+        stage_models={"identify": "small-model"},
+    )
+    responses = {
+        "small-model": mock_identification_response,
+        "big-model": mock_meal_synthesis_response,
+    }
+    generate = AsyncMock(
+        side_effect=lambda model, contents, config: SimpleNamespace(
+            text=responses[model], usage_metadata=None
+        )
+    )
+    with patch.object(generator._genai_client.aio.models, "generate_content", generate):
+        await generator.generate_meal_async("eggs")
+
+    assert [call.kwargs["model"] for call in generate.await_args_list] == [
+        "small-model",
+        "big-model",
+    ]
+    with pytest.raises(ValueError):
+        MealGenerator(api_key="dummy", stage_models={"synthesise": "x"})
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_model_is_hedged_with_fallback():
+    """Tests that the fallback model answers when the primary is too slow."""
+    generator = MealGenerator(
+        api_key="dummy",
+        model_name="primary",
+        fallback_model="secondary",
+        fallback_after=0.01,
+        circuit_breaker=CircuitBreaker(),
+    )
+    primary_cancelled = asyncio.Event()
+
+    async def fake_generate(model, contents, config):
+        if model == "primary":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+        return SimpleNamespace(text=f"from {model}", usage_metadata=None)
+
+    with patch.object(
+        generator._genai_client.aio.models, "generate_content", fake_generate
+    ):
+        text = await generator._call_ai_model_async(
+            "p", generator._create_model_config()
+        )
+        await asyncio.wait_for(primary_cancelled.wait(), 1)
+
+    assert text == "from secondary"
+    assert generator.fallback_stats == {
+        "hedged": 1,
+        "fallbacks": 0,
+        "fallback_wins": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_model_falls_back():
+    """Tests that the fallback model is tried when the primary fails outright."""
+    generator = MealGenerator(
+        api_key="dummy",
+        model_name="primary",
+        fallback_model="secondary",
+        retry_policy=RetryPolicy(max_retries=0),
+        circuit_breaker=CircuitBreaker(),
+    )
+
+    async def fake_generate(model, contents, config):
+        if model == "primary":
+            raise errors.APIError(500, {})
+        return SimpleNamespace(text="from secondary", usage_metadata=None)
+
+    with patch.object(
+        generator._genai_client.aio.models, "generate_content", fake_generate
+    ):
+        text = await generator._call_ai_model_async(
+            "p", generator._create_model_config()
+        )
+
+    assert text == "from secondary"
+    assert generator.fallback_stats["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_model_has_its_own_circuit_breaker():
+    """Tests that an open breaker on the primary does not block the fallback."""
+    generator = MealGenerator(
+        api_key="dummy",
+        model_name="overloaded-primary",
+        fallback_model="healthy-secondary",
+        retry_policy=RetryPolicy(max_retries=0),
+        circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60.0),
+    )
+
+    async def fake_generate(model, contents, config):
+        if model == "overloaded-primary":
+            raise errors.APIError(503, {})
+        return SimpleNamespace(text="from secondary", usage_metadata=None)
+
+    with patch.object(
+        generator._genai_client.aio.models, "generate_content", fake_generate
+    ):
+        for _ in range(2):
+            text = await generator._call_ai_model_async(
+                "p", generator._create_model_config()
+            )
+            assert text == "from secondary"
+
+    breakers = generator.retry_stats["circuit_breakers"]
+    assert breakers["overloaded-primary"]["state"] == CircuitBreaker.OPEN
+    assert breakers["healthy-secondary"]["state"] == CircuitBreaker.CLOSED
+    assert generator.retry_stats["circuit_rejections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_pool_ejects_exhausted_key_and_retries_on_another():
+    """Tests that a 429 ejects the key and the retry uses another pooled client."""
+
+    def fake_client(name: str, side_effect) -> SimpleNamespace:
+        generate = AsyncMock(side_effect=side_effect)
+        return SimpleNamespace(
+            name=name,
+            aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate)),
+        )
+
+    exhausted = fake_client("exhausted", errors.APIError(429, {}))
+    healthy = fake_client("healthy", [SimpleNamespace(text="ok", usage_metadata=None)])
+    pool = ClientPool(clients=[exhausted, healthy])
+    generator = MealGenerator(
+        client_pool=pool,
+        retry_policy=_fast_retry_policy(),
+        circuit_breaker=CircuitBreaker(),
+    )
+
+    assert (
+        await generator._call_ai_model_async("p", generator._create_model_config())
+        == "ok"
+    )
+    exhausted.aio.models.generate_content.assert_awaited_once()
+    assert [member["quota_ejections"] for member in pool.stats] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_quota_errors_fail_over_without_opening_the_breaker():
+    """Tests that 429s from one key do not trip the breaker while another is healthy."""
+
+    def fake_client(side_effect) -> SimpleNamespace:
+        generate = AsyncMock(side_effect=side_effect)
+        return SimpleNamespace(
+            aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate))
+        )
+
+    exhausted = fake_client(errors.APIError(429, {}))
+    healthy = fake_client(
+        lambda **kwargs: SimpleNamespace(text="ok", usage_metadata=None)
+    )
+    now = [0.0]
+    pool = ClientPool(
+        clients=[exhausted, healthy], ejection_time=1.0, clock=lambda: now[0]
+    )
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    generator = MealGenerator(
+        client_pool=pool,
+        retry_policy=_fast_retry_policy(0),
+        circuit_breaker=breaker,
+    )
+
+    for _ in range(6):
+        # Each ejection has expired, so the exhausted key is picked first again.
+        now[0] += 2.0
+        text = await generator._call_ai_model_async(
+            "p", generator._create_model_config()
+        )
+        assert text == "ok"
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert generator.retry_stats["key_failovers"] == 6
+    assert generator.retry_stats["circuit_rejections"] == 0
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.generator.MealGenerator.generate_meal_async")
+async def test_sync_api_runs_on_a_persistent_background_loop(
+    mock_generate: AsyncMock,
+):
+    """Tests that sync calls share one loop and work inside a running loop."""
+    loops = []
+
+    async def fake_generate(description, country_code):
+        loops.append(asyncio.get_running_loop())
+        return description
+
+    mock_generate.side_effect = fake_generate
+    background_loop = BackgroundLoop()
+    try:
+        generator = MealGenerator(api_key="dummy", background_loop=background_loop)
+        assert generator.generate_meal("first") == "first"
+        assert generator.generate_meal("second") == "second"
+    finally:
+        background_loop.close()
+
+    assert loops[0] is loops[1]
+    assert loops[0] is not asyncio.get_running_loop()
+
+
+@patch("src.meal_generator.generator.MealGenerator.stream_components_async")
+def test_sync_stream_components(mock_stream):
+    """Tests that streamed components are available from a plain iterator."""
+
+    async def fake_stream(description, country_code):
+        for name in ("a", "b"):
+            yield name
+
+    mock_stream.side_effect = fake_stream
+    generator = MealGenerator(api_key="dummy")
+    assert list(generator.stream_components("ab")) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_shared_generators_reuse_client_and_retriever():
+    """Tests that shared generators reuse resources that survive their close."""
+    first = MealGenerator.shared(api_key="dummy")
+    second = MealGenerator.shared(api_key="dummy")
+    try:
+        assert first._genai_client is second._genai_client
+        assert first._retriever is second._retriever
+        with (
+            patch.object(first._retriever, "aclose", AsyncMock()) as retriever_close,
+            patch.object(
+                first._genai_client.aio, "aclose", AsyncMock()
+            ) as client_close,
+        ):
+            async with first:
+                pass
+        retriever_close.assert_not_awaited()
+        client_close.assert_not_awaited()
+    finally:
+        await MealGenerator.aclose_shared()
+    assert MealGenerator.shared(api_key="dummy")._genai_client is not (
+        first._genai_client
+    )
+    await MealGenerator.aclose_shared()
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager_closes_owned_client():
+    """Tests that a generator closes the client and retriever it created."""
+    generator = MealGenerator(api_key="dummy")
+    with (
+        patch.object(generator._retriever, "aclose", AsyncMock()) as retriever_close,
+        patch.object(
+            generator._genai_client.aio, "aclose", AsyncMock()
+        ) as client_close,
+    ):
+        async with generator:
+            pass
+    retriever_close.assert_awaited_once()
+    client_close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager_leaves_injected_retriever_open():
+    """Tests that a retriever passed in is not closed with the generator."""
+    retriever = Retriever()
+    with patch.object(retriever, "aclose", AsyncMock()) as retriever_close:
+        async with MealGenerator(api_key="dummy", retriever=retriever):
+            pass
+    retriever_close.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_reports_cold_and_warm_latency():
+    """Tests that warm-up makes two metadata calls and times each."""
+    generator = MealGenerator(api_key="dummy", model_name="some-model")
+    get = AsyncMock()
+    with patch.object(generator._genai_client.aio.models, "get", get):
+        timings = await generator.warm_up_async()
+
+    assert set(timings) == {"cold_seconds", "warm_seconds"}
+    assert get.await_count == 2
+    get.assert_awaited_with(model="some-model")
@@ -0,0 +1,90 @@
+import pytest
+from src.meal_generator.llm_cache import LLMResponseCache
+from src.meal_generator.models import _MealResponse, _IdentificationResponse
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    return str(tmp_path / "llm.sqlite")
+
+
+def test_make_key_depends_on_model_prompt_and_schema():
+    """Tests that each part of the key changes the cache key."""
+    key = LLMResponseCache.make_key("model-a", "prompt", _MealResponse)
+    assert key == LLMResponseCache.make_key("model-a", "prompt", _MealResponse)
+    assert key != LLMResponseCache.make_key("model-b", "prompt", _MealResponse)
+    assert key != LLMResponseCache.make_key("model-a", "prompt!", _MealResponse)
+    assert key != LLMResponseCache.make_key(
+        "model-a", "prompt", _IdentificationResponse
+    )
+
+
+def test_get_set_and_ttl_expiry(cache_path: str):
+    """Tests round-tripping a response and expiring it after the TTL."""
+    clock = _FakeClock()
+    cache = LLMResponseCache(cache_path, ttl=60, clock=clock)
+    cache.set("k", '{"status": "ok"}')
+    assert cache.get("k") == '{"status": "ok"}'
+    clock.now += 61
+    assert cache.get("k") is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_size_based_eviction_drops_least_recently_used(cache_path: str):
+    """Tests that the oldest-accessed entries are evicted beyond max_bytes."""
+    clock = _FakeClock()
+    cache = LLMResponseCache(cache_path, max_bytes=20, clock=clock)
+    cache.set("a", "x" * 8)
+    clock.now += 1
+    cache.set("b", "y" * 8)
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("c", "z" * 8)
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 8
+    assert cache.stats["evictions"] == 1
+
+
+def test_overwriting_a_key_does_not_inflate_stored_size(cache_path: str):
+    """Tests that the running size total accounts for replaced entries."""
+    cache = LLMResponseCache(cache_path, max_bytes=20)
+    for _ in range(5):
+        cache.set("a", "x" * 8)
+    cache.set("b", "y" * 8)
+    assert cache.get("a") == "x" * 8
+    assert cache.stats["evictions"] == 0
+
+
+def test_expired_entries_are_swept_periodically(cache_path: str):
+    """Tests that expired entries are purged on the next write after the interval."""
+    clock = _FakeClock()
+    cache = LLMResponseCache(cache_path, ttl=60, sweep_interval=30, clock=clock)
+    cache.set("a", "x")
+    clock.now += 10
+    cache.set("b", "y")
+    assert cache.stats["evictions"] == 0
+    clock.now += 61
+    cache.set("c", "z")
+    assert cache.stats["evictions"] == 2
+
+
+def test_read_only_replica_serves_hits_without_writing(cache_path: str):
+    """Tests that a read-only cache reads existing entries and ignores writes."""
+    writer = LLMResponseCache(cache_path)
+    writer.set("k", "v")
+    writer.close()
+
+    replica = LLMResponseCache(cache_path, read_only=True)
+    assert replica.get("k") == "v"
+    replica.set("other", "ignored")
+    assert replica.get("other") is None
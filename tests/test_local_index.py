@@ -0,0 +1,97 @@
+import json
+import pytest
+from src.meal_generator.local_index import (
+    LocalIndexError,
+    LocalRetriever,
+    build_local_index,
+)
+from src.meal_generator.models import _IdentifiedComponent
+
+
+def _raw_product(code: str, name: str, brand: str, countries: list) -> dict:
+    return {
+        "code": code,
+        "product_name": name,
+        "brands": brand,
+        "countries_tags": countries,
+        "ingredients_text": "not needed in the index",
+        "nutriments": {
+            "energy-kcal_100g": 120,
+            "fat_100g": 2.5,
+            "carbohydrates_100g": 1.0,
+            "proteins_100g": 24.0,
+            "energy-kcal_serving": 180,
+        },
+    }
+
+
+@pytest.fixture
+def index_path(tmp_path) -> str:
+    """Builds a small multi-country index from a JSONL dump."""
+    dump = tmp_path / "products.jsonl"
+    products = [
+        _raw_product("1", "Chicken Breast Fillets", "Tesco", ["en:united-kingdom"]),
+        _raw_product("2", "Chicken Breast", "Carrefour", ["en:france"]),
+        _raw_product("3", "Coke Zero", "Coca-Cola", ["en:united-kingdom"]),
+    ]
+    dump.write_text("\n".join(json.dumps(p) for p in products))
+    path = str(tmp_path / "off.sqlite")
+    assert build_local_index(str(dump), path) == 3
+    return path
+
+
+def test_build_local_index_from_csv(tmp_path):
+    """Tests ingesting the tab-separated CSV export with a country filter."""
+    dump = tmp_path / "products.csv"
+    dump.write_text(
+        "code\tproduct_name\tbrands\tcountries_en\tenergy-kcal_100g\tfat_100g\n"
+        "1\tOat Milk\tOatly\tUnited Kingdom,Sweden\t46\t1.5\n"
+        "2\tSoy Milk\tAlpro\tBelgium\t39\t1.8\n"
+    )
+    path = str(tmp_path / "off.sqlite")
+    assert build_local_index(str(dump), path, countries=["en:sweden"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_local_retriever_exact_match(index_path: str):
+    """Tests that a branded lookup yields the same payload as the API path."""
+    retriever = LocalRetriever(index_path)
+    components = [_IdentifiedComponent(query="chicken breast", brand="Tesco")]
+    results = await retriever.process_components_concurrently(components, "GB")
+    await retriever.aclose()
+
+    assert results[0]["data_source"] == "retrieved_api"
+    assert results[0]["found_brand"] == "Tesco"
+    assert results[0]["source_url"] == "https://world.openfoodfacts.org/product/1"
+    assert results[0]["nutrients_per_100g"]["protein"] == 24.0
+
+
+@pytest.mark.asyncio
+async def test_local_retriever_filters_by_country(index_path: str):
+    """Tests that contextual examples only come from the requested country."""
+    retriever = LocalRetriever(index_path)
+    components = [_IdentifiedComponent(query="chicken breast")]
+    results = await retriever.process_components_concurrently(components, "GB")
+    await retriever.aclose()
+
+    examples = results[0]["contextual_examples"]
+    assert [e["brand"] for e in examples] == ["Tesco"]
+    assert examples[0]["energy_kcal"] == 180
+
+
+@pytest.mark.asyncio
+async def test_local_retriever_maps_non_gb_country_codes(index_path: str):
+    """Tests that ISO codes other than GB match the country names in the index."""
+    retriever = LocalRetriever(index_path)
+    components = [_IdentifiedComponent(query="chicken breast")]
+    results = await retriever.process_components_concurrently(components, "FR")
+    await retriever.aclose()
+
+    examples = results[0]["contextual_examples"]
+    assert [e["brand"] for e in examples] == ["Carrefour"]
+
+
+def test_local_retriever_missing_index(tmp_path):
+    """Tests that opening a non-existent index raises a clear error."""
+    with pytest.raises(LocalIndexError):
+        LocalRetriever(str(tmp_path / "missing.sqlite"))
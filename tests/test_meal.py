@@ -83,4 +83,12 @@ def test_remove_component(sample_meal: Meal, meal_component_fixt: MealComponent)
     """Tests removing a component and verifies nutrient recalculation."""
     sample_meal.remove_component(meal_component_fixt.id)
     assert len(sample_meal.component_list) == 0
-    assert sample_meal.nutrient_profile.energy == 0
\ No newline at end of file
+    assert sample_meal.nutrient_profile.energy == 0
+
+
+def test_meal_round_trip(sample_meal: Meal):
+    """Tests lossless dict and JSON round-tripping of a meal and its components."""
+    restored = Meal.from_json(sample_meal.to_json())
+    assert restored.id == sample_meal.id
+    assert restored.as_dict() == sample_meal.as_dict()
+    assert restored.nutrient_profile == sample_meal.nutrient_profile
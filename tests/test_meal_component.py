@@ -24,4 +24,11 @@ def test_meal_component_as_dict(meal_component_fixt: MealComponent):
     assert component_dict["type"] == "food"
     assert component_dict["source_url"] == "http://example.com/chicken"
     assert "nutrient_profile" in component_dict
-    assert component_dict["nutrient_profile"]["energy"] == 150.0
\ No newline at end of file
+    assert component_dict["nutrient_profile"]["energy"] == 150.0
+
+
+def test_meal_component_round_trip(meal_component_fixt: MealComponent):
+    """Tests lossless dict and JSON round-tripping, preserving the id."""
+    restored = MealComponent.from_json(meal_component_fixt.to_json())
+    assert restored.id == meal_component_fixt.id
+    assert restored.as_dict() == meal_component_fixt.as_dict()
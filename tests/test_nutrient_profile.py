@@ -64,3 +64,12 @@ def test_nutrient_profile_addition_with_data_source():
     result2 = p1 + p3
     assert result2.energy == 120.0
     assert result2.data_source == DataSource.ESTIMATED_WITH_CONTEXT
+
+
+def test_nutrient_profile_round_trip():
+    """Tests lossless dict and JSON round-tripping, including the data source."""
+    profile = NutrientProfile(
+        energy=100, contains_gluten=True, data_source=DataSource.RETRIEVED_API
+    )
+    assert NutrientProfile.from_dict(profile.as_dict()) == profile
+    assert NutrientProfile.from_json(profile.to_json()) == profile
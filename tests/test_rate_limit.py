@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from src.meal_generator.rate_limit import RateLimiter, parse_retry_after
+
+
+def test_parse_retry_after_seconds_and_date():
+    """Tests both Retry-After header forms."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    delay = parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0)
+    assert delay == 10.0
+
+
+def test_report_throttled_halves_rate_and_recovers():
+    """Tests adaptive backoff on throttling and recovery on success."""
+    limiter = RateLimiter(rate=4.0, burst=1, max_backoff=5.0)
+    assert limiter.report_throttled() == 1.0
+    assert limiter.report_throttled() == 2.0
+    assert limiter.report_throttled(retry_after=30) == 5.0
+    assert limiter.stats["current_rate"] == 0.5
+    assert limiter.stats["throttled"] == 3
+    for _ in range(20):
+        limiter.report_success()
+    assert limiter.stats["current_rate"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_slot_enforces_concurrency_cap():
+    """Tests that no more than max_concurrency requests run at once."""
+    limiter = RateLimiter(rate=1000, burst=1000, max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert peak == 2
+    assert limiter.stats["acquired"] == 6
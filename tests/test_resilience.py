@@ -0,0 +1,70 @@
+import asyncio
+import aiohttp
+import httpx
+from google.genai import errors
+from src.meal_generator.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    is_retryable_error,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_is_retryable_error():
+    """Tests that only transient provider errors are retried."""
+    assert is_retryable_error(errors.APIError(503, {}))
+    assert is_retryable_error(errors.APIError(429, {}))
+    assert is_retryable_error(asyncio.TimeoutError())
+    assert not is_retryable_error(errors.APIError(400, {}))
+    assert not is_retryable_error(ValueError("bad"))
+
+
+def test_transport_failures_are_retryable():
+    """Tests that aiohttp/httpx transport errors count as transient."""
+    assert is_retryable_error(aiohttp.ServerDisconnectedError())
+    assert is_retryable_error(aiohttp.ClientOSError())
+    assert is_retryable_error(httpx.ConnectError("refused"))
+    assert is_retryable_error(OSError("network unreachable"))
+
+
+def test_retry_policy_backoff_is_capped_and_honours_retry_after():
+    """Tests the jitter ceiling doubles per attempt up to max_delay."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=lambda low, high: high)
+
+    assert [policy.delay(attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 5.0]
+    jittered = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=lambda low, high: low)
+    assert jittered.delay(0, retry_after=3.0) == 3.0
+    assert jittered.delay(0, retry_after=60.0) == 5.0
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    """Tests the closed -> open -> half-open -> closed cycle."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()  # the single probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats["opened"] == 2
+    assert breaker.stats["rejected"] == 2
@@ -0,0 +1,376 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.meal_generator.background_loop import BackgroundLoop
+from src.meal_generator.models import _IdentifiedComponent
+from src.meal_generator.rate_limit import RateLimiter
+from src.meal_generator.retriever import Retriever
+
+
+def _product(name: str, brand: str) -> dict:
+    return {
+        "product_name": name,
+        "brands": brand,
+        "url": f"https://example.com/{name}",
+        "nutriments": {
+            "energy-kcal_100g": 250.0,
+            "fat_100g": 10.0,
+            "carbohydrates_100g": 30.0,
+            "proteins_100g": 8.0,
+        },
+    }
+
+
+@pytest_asyncio.fixture
+async def off_server(start_off_server):
+    """Runs a local stand-in for the Open Food Facts search endpoint."""
+
+    async def search(request: web.Request) -> web.Response:
+        products = [_product("Whole Wheat Toast", "Hovis")]
+        return web.json_response({"count": len(products), "products": products})
+
+    return await start_off_server(search)
+
+
+@pytest_asyncio.fixture
+async def retriever(off_server: TestServer):
+    """Provides a Retriever pointed at the local stub server."""
+    retriever = Retriever(api_url=str(off_server.make_url("/cgi/search.pl")))
+    yield retriever
+    await retriever.aclose()
+
+
+@pytest.mark.asyncio
+async def test_exact_match_is_retrieved(retriever: Retriever):
+    """Tests that a branded component resolves to the retrieved API payload."""
+    components = [_IdentifiedComponent(query="Whole Wheat Toast", brand="Hovis")]
+    results = await retriever.process_components_concurrently(components, "GB")
+    assert len(results) == 1
+    assert results[0]["data_source"] == "retrieved_api"
+    assert results[0]["nutrients_per_100g"]["energy"] == 250.0
+
+
+@pytest.mark.asyncio
+async def test_search_requests_projected_fields(
+    retriever: Retriever, off_server: TestServer
+):
+    """Tests that only the needed product fields are requested and measured."""
+    components = [_IdentifiedComponent(query="toast")]
+    await retriever.process_components_concurrently(components, "GB")
+    assert off_server.requests[0]["fields"] == "product_name,brands,url,nutriments"
+    assert retriever.cache_stats["bytes_received"] > 0
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_across_calls(retriever: Retriever):
+    """Tests that consecutive meals reuse pooled connections."""
+    for query in ("Whole Wheat Toast", "Scrambled Eggs"):
+        components = [_IdentifiedComponent(query=query, brand="Hovis")]
+        await retriever.process_components_concurrently(components, "GB")
+    stats = retriever.connection_stats
+    assert stats["created"] == 1
+    assert stats["reused"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager_closes_session(off_server: TestServer):
+    """Tests that exiting the context manager releases the session."""
+    async with Retriever(api_url=str(off_server.make_url("/cgi/search.pl"))) as r:
+        components = [_IdentifiedComponent(query="toast")]
+        await r.process_components_concurrently(components, "GB")
+        session = r._get_session()
+    assert session.closed
+    assert len(r._sessions) == 0
+
+
+def test_session_from_finished_loop_is_closed():
+    """Tests that switching event loops closes the session left on the old one."""
+    retriever = Retriever()
+
+    async def get_session():
+        session = retriever._get_session()
+        await asyncio.sleep(0)
+        return session
+
+    first = asyncio.run(get_session())
+    second = asyncio.run(get_session())
+    assert first.closed
+    assert second is not first
+    asyncio.run(retriever.aclose())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loops_use_their_own_sessions(start_off_server):
+    """Tests that a lookup on another running loop survives use from this one."""
+    server = await start_off_server(_slow_search([0.3]))
+    background = BackgroundLoop()
+    retriever = Retriever(
+        api_url=str(server.make_url("/cgi/search.pl")), rate_limiter=RateLimiter()
+    )
+    try:
+        in_background = asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(
+                retriever.process_components_concurrently(
+                    [_IdentifiedComponent(query="coke zero")], "GB"
+                ),
+                background.loop,
+            )
+        )
+        await asyncio.sleep(0.1)
+        here = await retriever.process_components_concurrently(
+            [_IdentifiedComponent(query="coke zero")], "GB"
+        )
+        there = await in_background
+        assert here[0]["retrieval_status"] == "contextual"
+        assert there[0]["retrieval_status"] == "contextual"
+        assert len(retriever._sessions) == 2
+    finally:
+        await retriever.aclose()
+        background.close()
+    assert len(retriever._sessions) == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache(
+    retriever: Retriever, off_server: TestServer
+):
+    """Tests that a repeated search does not hit the network again."""
+    components = [_IdentifiedComponent(query="Chicken Breast")]
+    await retriever.process_components_concurrently(components, "GB")
+    await retriever.process_components_concurrently(components, "GB")
+    assert len(off_server.requests) == 1
+    assert retriever.cache_stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_are_coalesced(
+    retriever: Retriever, off_server: TestServer
+):
+    """Tests that identical in-flight searches share a single request."""
+    components = [_IdentifiedComponent(query="coke zero")]
+    results = await asyncio.gather(
+        *(retriever.process_components_concurrently(components, "GB") for _ in range(5))
+    )
+    assert len(results) == 5
+    assert len(off_server.requests) == 1
+    assert retriever.cache_stats["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_lookup_after_abandoned_search_starts_a_fresh_request(
+    retriever: Retriever, off_server: TestServer
+):
+    """Tests that a search abandoned by its last waiter is not reused."""
+    session = retriever._get_session()
+    abandoned = asyncio.ensure_future(
+        retriever._get_products_async(session, "coke zero", "GB", 3)
+    )
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    await asyncio.gather(abandoned, return_exceptions=True)
+
+    products = await retriever._get_products_async(session, "coke zero", "GB", 3)
+    assert products[0]["product_name"] == "Whole Wheat Toast"
+
+
+@pytest.mark.asyncio
+async def test_equivalent_components_are_looked_up_once(
+    retriever: Retriever, off_server: TestServer
+):
+    """Tests that canonically equal components share one lookup."""
+    components = [
+        _IdentifiedComponent(query="Chicken breast", user_specified_quantity="1"),
+        _IdentifiedComponent(query="chicken breasts", user_specified_quantity="2"),
+        _IdentifiedComponent(query="breast, chicken"),
+    ]
+    results = await retriever.process_components_concurrently(components, "GB")
+    assert len(off_server.requests) == 1
+    assert retriever.cache_stats["deduplicated"] == 2
+    assert [r["user_query"] for r in results] == [c.query for c in components]
+    assert results[1]["user_specified_quantity"] == "2"
+
+
+def _throttling_search(responses: list):
+    """Serves the given status codes in order, then products."""
+
+    async def search(request: web.Request) -> web.Response:
+        if responses:
+            return web.Response(status=responses.pop(0), headers={"Retry-After": "0"})
+        products = [_product("Coke Zero", "Coca-Cola")]
+        return web.json_response({"count": 1, "products": products})
+
+    return search
+
+
+@pytest.mark.asyncio
+async def test_throttled_request_is_retried_after_retry_after(start_off_server):
+    """Tests that a 429 honours Retry-After and the lookup then succeeds."""
+    server = await start_off_server(_throttling_search([429]))
+    limiter = RateLimiter()
+    async with Retriever(
+        api_url=str(server.make_url("/cgi/search.pl")), rate_limiter=limiter
+    ) as retriever:
+        components = [_IdentifiedComponent(query="coke zero", brand="Coca-Cola")]
+        results = await retriever.process_components_concurrently(components, "GB")
+
+    assert results[0]["retrieval_status"] == "matched"
+    assert limiter.stats["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_persistent_throttling_is_reported_distinctly(start_off_server):
+    """Tests that exhausted throttle retries are not reported as a miss."""
+    server = await start_off_server(_throttling_search([503] * 10))
+    async with Retriever(
+        api_url=str(server.make_url("/cgi/search.pl")),
+        rate_limiter=RateLimiter(),
+        max_throttle_retries=1,
+    ) as retriever:
+        components = [_IdentifiedComponent(query="coke zero")]
+        results = await retriever.process_components_concurrently(components, "GB")
+        stats = retriever.cache_stats
+
+    assert results[0]["data_source"] == "estimated_model"
+    assert results[0]["retrieval_status"] == "throttled"
+    assert stats["throttled"] == 1
+    assert stats["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_speculative_exact_match_cancels_contextual_search(start_off_server):
+    """Tests that a Layer 1 win cancels the in-flight Layer 2 request."""
+    contextual_started = asyncio.Event()
+
+    async def search(request: web.Request) -> web.Response:
+        if request.query["search_terms"].startswith("Hovis"):
+            await contextual_started.wait()
+            products = [_product("Whole Wheat Toast", "Hovis")]
+            return web.json_response({"count": 1, "products": products})
+        contextual_started.set()
+        await asyncio.sleep(5)
+        return web.json_response({"count": 0, "products": []})
+
+    server = await start_off_server(search)
+    async with Retriever(
+        api_url=str(server.make_url("/cgi/search.pl")),
+        rate_limiter=RateLimiter(),
+        speculative=True,
+    ) as retriever:
+        components = [_IdentifiedComponent(query="Whole Wheat Toast", brand="Hovis")]
+        results = await asyncio.wait_for(
+            retriever.process_components_concurrently(components, "GB"), timeout=2
+        )
+        stats = retriever.speculation_stats
+
+    assert results[0]["retrieval_status"] == "matched"
+    assert stats == {"exact_wins": 1, "contextual_wins": 0, "contextual_cancelled": 1}
+
+
+@pytest.mark.asyncio
+async def test_speculative_exact_miss_uses_contextual_result(
+    off_server: TestServer,
+):
+    """Tests that a Layer 1 miss falls through to the concurrent Layer 2 result."""
+    async with Retriever(
+        api_url=str(off_server.make_url("/cgi/search.pl")), speculative=True
+    ) as retriever:
+        components = [_IdentifiedComponent(query="toast", brand="Warburtons")]
+        results = await retriever.process_components_concurrently(components, "GB")
+        stats = retriever.speculation_stats
+
+    assert results[0]["retrieval_status"] == "contextual"
+    assert stats["contextual_wins"] == 1
+    assert len(off_server.requests) == 2
+
+
+def _slow_search(delays: list):
+    """Delays each request by the next value in ``delays`` (0 once exhausted)."""
+
+    async def search(request: web.Request) -> web.Response:
+        await asyncio.sleep(delays.pop(0) if delays else 0)
+        products = [_product("Coke Zero", "Coca-Cola")]
+        return web.json_response({"count": 1, "products": products})
+
+    return search
+
+
+@pytest.mark.asyncio
+async def test_timed_out_lookup_degrades_to_estimated_model(start_off_server):
+    """Tests that a slow search degrades the component instead of stalling."""
+    server = await start_off_server(_slow_search([5]))
+    async with Retriever(
+        api_url=str(server.make_url("/cgi/search.pl")),
+        rate_limiter=RateLimiter(),
+        request_timeout=0.1,
+    ) as retriever:
+        components = [_IdentifiedComponent(query="coke zero")]
+        results = await retriever.process_components_concurrently(components, "GB")
+        stats = retriever.cache_stats
+
+    assert results[0]["data_source"] == "estimated_model"
+    assert results[0]["retrieval_status"] == "timeout"
+    assert stats["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queueing_does_not_count_towards_deadline(
+    off_server: TestServer,
+):
+    """Tests that waiting for a rate-limiter slot is not reported as a timeout."""
+    async with Retriever(
+        api_url=str(off_server.make_url("/cgi/search.pl")),
+        rate_limiter=RateLimiter(rate=10, burst=2),
+        request_timeout=0.2,
+    ) as retriever:
+        components = [_IdentifiedComponent(query=f"food {i}") for i in range(6)]
+        results = await retriever.process_components_concurrently(components, "GB")
+        stats = retriever.cache_stats
+
+    assert [r["retrieval_status"] for r in results] == ["contextual"] * 6
+    assert stats["timeouts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lookup_budget_bounds_rate_limiter_backoff(off_server: TestServer):
+    """Tests that a long throttle backoff degrades the lookup within its budget."""
+    limiter = RateLimiter()
+    limiter.report_throttled(30.0)
+    async with Retriever(
+        api_url=str(off_server.make_url("/cgi/search.pl")),
+        rate_limiter=limiter,
+        lookup_timeout=0.2,
+    ) as retriever:
+        components = [_IdentifiedComponent(query="coke zero")]
+        results = await asyncio.wait_for(
+            retriever.process_components_concurrently(components, "GB"), 2
+        )
+        stats = retriever.cache_stats
+
+    assert results[0]["data_source"] == "estimated_model"
+    assert results[0]["retrieval_status"] == "timeout"
+    assert stats["timeouts"] == 1
+    assert off_server.requests == []
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(start_off_server):
+    """Tests that a request slower than the latency percentile is hedged."""
+    server = await start_off_server(_slow_search([0, 5]))
+    async with Retriever(
+        api_url=str(server.make_url("/cgi/search.pl")),
+        rate_limiter=RateLimiter(),
+        request_timeout=2,
+        hedge_percentile=0.5,
+        hedge_min_samples=1,
+    ) as retriever:
+        for query in ("warm up", "coke zero"):
+            components = [_IdentifiedComponent(query=query)]
+            results = await retriever.process_components_concurrently(components, "GB")
+        stats = retriever.cache_stats
+
+    assert results[0]["retrieval_status"] == "contextual"
+    assert stats["hedged"] == 1
+    assert stats["timeouts"] == 0
@@ -0,0 +1,42 @@
+import json
+from src.meal_generator.streaming import JSONArrayItemParser
+
+
+def _feed_in_chunks(parser: JSONArrayItemParser, text: str, size: int) -> list:
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start : start + size]))
+    return items
+
+
+def test_parser_yields_each_completed_item():
+    """Tests that array items are emitted as soon as they close."""
+    parser = JSONArrayItemParser("components")
+    assert parser.feed('{"status": "ok", "result": {"components": [{"query": "a"}') == [
+        '{"query": "a"}'
+    ]
+    assert parser.feed(', {"query": "b"}]}}') == ['{"query": "b"}']
+    assert json.loads(parser.text)["result"]["components"][1]["query"] == "b"
+
+
+def test_parser_handles_strings_nesting_and_tiny_chunks():
+    """Tests braces inside strings, nested objects and arbitrary chunk splits."""
+    document = {
+        "status": "ok",
+        "result": {
+            "name": "components",
+            "components": [
+                {"query": 'a "}" b', "nested": {"components": [1, 2]}},
+                {"query": "c", "list": [{"x": 1}]},
+            ],
+        },
+    }
+    text = json.dumps(document)
+    items = _feed_in_chunks(JSONArrayItemParser("components"), text, 1)
+    assert [json.loads(item) for item in items] == document["result"]["components"]
+
+
+def test_parser_ignores_other_arrays():
+    """Tests that only the array under the requested key is extracted."""
+    text = json.dumps({"other": [{"a": 1}], "components": [{"b": 2}]})
+    assert _feed_in_chunks(JSONArrayItemParser("components"), text, 7) == ['{"b": 2}']
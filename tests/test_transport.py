@@ -0,0 +1,233 @@
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from google.genai import types
+from unittest.mock import AsyncMock, patch
+
+from src.meal_generator.generator import MealGenerator
+from src.meal_generator.models import _IdentificationResponse, _IdentifiedComponent
+from src.meal_generator.resilience import CircuitBreaker
+from src.meal_generator.retriever import Retriever
+from src.meal_generator.transport import (
+    Cassette,
+    CassetteMissError,
+    RecordingGenaiClient,
+    RecordingTransport,
+    ReplayGenaiClient,
+    ReplayTransport,
+)
+
+_IDENTIFICATION = {"status": "ok", "result": {"components": [{"query": "Toast"}]}}
+_MEAL = {
+    "status": "ok",
+    "result": {
+        "name": "Toast",
+        "description": "Buttered toast.",
+        "type": "snack",
+        "components": [
+            {
+                "name": "Toast",
+                "quantity": 1.0,
+                "totalWeight": 40.0,
+                "type": "food",
+                "nutrientProfile": {
+                    "energy": 100.0,
+                    "fats": 1.0,
+                    "saturatedFats": 0.5,
+                    "carbohydrates": 20.0,
+                    "sugars": 1.0,
+                    "fibre": 2.0,
+                    "protein": 4.0,
+                    "salt": 0.4,
+                    "dataSource": "estimated_with_context",
+                },
+            }
+        ],
+    },
+}
+_PRODUCTS = {
+    "count": 1,
+    "products": [
+        {
+            "product_name": "White Toast",
+            "brands": "Acme",
+            "nutriments": {"energy-kcal_100g": 260.0},
+        }
+    ],
+}
+
+
+def _response(text: str) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)])
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=10, candidates_token_count=5, total_token_count=15
+        ),
+    )
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        if config.response_schema is _IdentificationResponse:
+            return _response(json.dumps(_IDENTIFICATION))
+        return _response(json.dumps(_MEAL))
+
+    async def generate_content_stream(self, model, contents, config):
+        async def _stream():
+            for text in ('{"status": ', '"ok"}'):
+                yield _response(text)
+
+        return _stream()
+
+
+class FakeClient:
+    def __init__(self):
+        self.aio = type("Aio", (), {"models": FakeModels(), "aclose": AsyncMock()})()
+
+
+@pytest_asyncio.fixture
+async def off_server(start_off_server):
+    """Runs a local stand-in for the Open Food Facts search endpoint."""
+
+    async def search(request: web.Request) -> web.Response:
+        return web.json_response(_PRODUCTS)
+
+    return await start_off_server(search)
+
+
+async def _generate(genai_client, retriever: Retriever) -> dict:
+    generator = MealGenerator(
+        genai_client=genai_client,
+        retriever=retriever,
+        circuit_breaker=CircuitBreaker(),
+    )
+    async with generator:
+        meal = await generator.generate_meal_async("buttered toast")
+    await retriever.aclose()
+    return meal.as_dict()
+
+
+def _without_ids(meal: dict) -> dict:
+    meal = dict(meal, id=None)
+    meal["components"] = [dict(c, id=None) for c in meal["components"]]
+    return meal
+
+
+@pytest.mark.asyncio
+async def test_recorded_pipeline_replays_offline(off_server: TestServer, tmp_path):
+    """Tests that a recorded meal generation replays without any live service."""
+    path = str(tmp_path / "toast.json")
+    api_url = str(off_server.make_url("/cgi/search.pl"))
+    cassette = Cassette(path)
+    client = FakeClient()
+    recorded = await _generate(
+        RecordingGenaiClient(client, cassette),
+        Retriever(
+            api_url=api_url, use_cache=False, transport=RecordingTransport(cassette)
+        ),
+    )
+    cassette.save()
+    assert client.aio.models.calls == 2
+    assert len(off_server.requests) == 1
+    assert cassette.stats["recorded"] == 3
+
+    replay = Cassette(path)
+    replayed = await _generate(
+        ReplayGenaiClient(replay),
+        Retriever(api_url=api_url, use_cache=False, transport=ReplayTransport(replay)),
+    )
+
+    assert _without_ids(replayed) == _without_ids(recorded)
+    assert len(off_server.requests) == 1
+    assert replay.stats == {"recorded": 0, "replayed": 3, "misses": 0}
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_raises():
+    """Tests that an unrecorded prompt is reported rather than answered."""
+    cassette = Cassette()
+    client = ReplayGenaiClient(cassette)
+
+    with pytest.raises(CassetteMissError):
+        await client.aio.models.generate_content(
+            model="m", contents="unrecorded", config=None
+        )
+    assert cassette.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieval_replay_miss_fails_the_run():
+    """Tests that an unrecorded search is not silently dropped from the context."""
+    retriever = Retriever(transport=ReplayTransport(Cassette()), use_cache=False)
+    components = [_IdentifiedComponent(query="unrecorded")]
+
+    with pytest.raises(CassetteMissError):
+        await retriever.process_components_concurrently(components, "GB")
+    await retriever.aclose()
+
+
+@pytest.mark.asyncio
+async def test_streamed_calls_record_and_replay_chunks():
+    """Tests that streams replay chunk by chunk with usage on the last chunk."""
+    cassette = Cassette()
+    recorder = RecordingGenaiClient(FakeClient(), cassette)
+    stream = await recorder.aio.models.generate_content_stream(
+        model="m", contents="prompt", config=None
+    )
+    assert [chunk.text async for chunk in stream] == ['{"status": ', '"ok"}']
+
+    replayer = ReplayGenaiClient(cassette)
+    stream = await replayer.aio.models.generate_content_stream(
+        model="m", contents="prompt", config=None
+    )
+    chunks = [chunk async for chunk in stream]
+    assert [chunk.text for chunk in chunks] == ['{"status": ', '"ok"}']
+    assert chunks[0].usage_metadata is None
+    assert chunks[-1].usage_metadata.total_token_count == 15
+
+    response = await replayer.aio.models.generate_content(
+        model="m", contents="prompt", config=None
+    )
+    assert response.text == '{"status": "ok"}'
+
+
+@pytest.mark.asyncio
+@patch("src.meal_generator.transport.asyncio.sleep", new_callable=AsyncMock)
+async def test_replay_injects_latency(mock_sleep: AsyncMock):
+    """Tests that replay adds the configured and, optionally, recorded latency."""
+    cassette = Cassette()
+    inner = AsyncMock()
+    inner.get.return_value = type(
+        "Response", (), {"status": 200, "body": b"{}", "headers": {}}
+    )()
+    with patch("src.meal_generator.transport.time.monotonic", side_effect=[0.0, 0.5]):
+        await RecordingTransport(cassette, inner).get(None, "http://off", {"q": "x"})
+
+    await ReplayTransport(cassette, latency=0.25).get(None, "http://off", {"q": "x"})
+    mock_sleep.assert_awaited_with(0.25)
+
+    transport = ReplayTransport(cassette, latency=lambda: 0.1, recorded_latency=True)
+    response = await transport.get(None, "http://off", {"q": "x"})
+    mock_sleep.assert_awaited_with(0.6)
+    assert response.status == 200 and response.body == b"{}"
+
+
+@pytest.mark.asyncio
+async def test_repeated_requests_replay_in_recorded_order():
+    """Tests that a request recorded twice replays both answers, then the last."""
+    cassette = Cassette()
+    request = {"kind": "http"}
+    cassette.record("key", request, {"n": 1})
+    cassette.record("key", request, {"n": 2})
+
+    assert [cassette.play("key", request)["n"] for _ in range(3)] == [1, 2, 2]